@@ -0,0 +1,97 @@
+"""
+Cost of reading extension settings from ``app.config`` compared to the
+``ConfigSnapshot`` built by ``Extend``.
+
+Sanic's ``Config`` is a dict with attribute access through
+``__getattr__``, so every read is a method call and a dict lookup. The
+snapshot is a slotted instance with the values already normalized.
+
+    python -m benchmarks.config --rounds 1000000 --output config.json
+"""
+import argparse
+import json
+import platform
+from timeit import timeit
+from typing import Any, Callable, Dict, List
+
+from sanic import Sanic, __version__
+
+from sanic_ext.bootstrap import Extend
+
+
+def _lookups(app: Sanic) -> Dict[str, Dict[str, Callable[[], Any]]]:
+    config = app.config
+    snapshot = app.ctx.ext.snapshot
+    return {
+        "CORS_ORIGINS": {
+            "config_attribute": lambda: config.CORS_ORIGINS,
+            "config_item": lambda: config["CORS_ORIGINS"],
+            "snapshot": lambda: snapshot.cors_origins,
+        },
+        "SERVER_NAME": {
+            "config_attribute": lambda: getattr(config, "SERVER_NAME", ""),
+            "config_item": lambda: config.get("SERVER_NAME") or "",
+            "snapshot": lambda: snapshot.server_name,
+        },
+        "TRACE_EXCLUDED_HEADERS": {
+            "config_attribute": lambda: frozenset(
+                header.strip().lower()
+                for header in config.TRACE_EXCLUDED_HEADERS
+            ),
+            "config_item": lambda: frozenset(
+                header.strip().lower()
+                for header in config["TRACE_EXCLUDED_HEADERS"]
+            ),
+            "snapshot": lambda: snapshot.trace_excluded_headers,
+        },
+    }
+
+
+def run(rounds: int) -> List[Dict[str, Any]]:
+    app = Sanic("config_snapshot")
+    Extend(
+        app, config={"cors_origins": "https://example.com", "oas": False}
+    )
+
+    results = []
+    for key, lookups in _lookups(app).items():
+        for kind, lookup in lookups.items():
+            seconds = timeit(lookup, number=rounds)
+            results.append(
+                {
+                    "key": key,
+                    "lookup": kind,
+                    "ns_per_lookup": round(seconds / rounds * 1e9, 2),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--output", default="config_benchmark.json")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    for row in results:
+        print(
+            f"{row['key']:>22} {row['lookup']:>16}: "
+            f"{row['ns_per_lookup']:8.1f} ns"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "sanic": __version__,
+                "rounds": args.rounds,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Per-request cost of the CORS response hooks.
+
+Every scenario builds an app through ``Extend`` in its own process and
+drives simple, credentialed and preflight requests through its ASGI
+interface. The overhead reported for each is the difference to the same
+request against an app with ``CORS=False``.
+
+    python -m benchmarks.cors --rounds 2000 --output cors.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+from typing import Any, Callable, Dict, List, Optional
+
+from sanic import Sanic, __version__
+from sanic.response import text
+
+from sanic_ext.bootstrap import Extend
+from sanic_ext.extensions.http.cors import cors
+
+from .utils import Headers, isolated, measure, start
+
+ORIGIN = b"https://tenant499.example.com"
+REGEX_ORIGINS = ",".join(
+    rf"https://tenant{i}[0-9]*\.example\.com" for i in range(500)
+)
+
+REQUESTS: Dict[str, Dict[str, Any]] = {
+    "simple": {
+        "method": "GET",
+        "headers": [(b"origin", ORIGIN)],
+    },
+    "credentialed": {
+        "method": "GET",
+        "headers": [
+            (b"origin", ORIGIN),
+            (b"authorization", b"Bearer token"),
+            (b"cookie", b"session=abc"),
+        ],
+    },
+    "preflight": {
+        "method": "OPTIONS",
+        "headers": [
+            (b"origin", ORIGIN),
+            (b"access-control-request-method", b"POST"),
+            (b"access-control-request-headers", b"content-type, x-request-id"),
+        ],
+    },
+}
+
+
+def _add_routes(app: Sanic, decorator: Optional[Callable] = None) -> None:
+    async def items(request):
+        return text("")
+
+    if decorator:
+        items = decorator(items)
+    app.route("/items", methods=["GET", "POST"])(items)
+
+
+def _build(name: str, config: Dict[str, Any], **route_kwargs) -> Sanic:
+    app = Sanic(f"cors_{name}")
+    Extend(app, config={"oas": False, **config})
+    _add_routes(app, **route_kwargs)
+    return app
+
+
+SCENARIOS: Dict[str, Callable[[], Sanic]] = {
+    "baseline": lambda: _build("baseline", {"cors": False}),
+    "single_origin": lambda: _build(
+        "single_origin", {"cors_origins": ORIGIN.decode()}
+    ),
+    "wildcard": lambda: _build("wildcard", {"cors_origins": "*"}),
+    "regex_origins": lambda: _build(
+        "regex_origins", {"cors_origins": REGEX_ORIGINS}
+    ),
+    "route_override": lambda: _build(
+        "route_override",
+        {"cors_origins": "https://other.example.com"},
+        decorator=cors(
+            origin=ORIGIN.decode(),
+            allow_headers=["content-type", "x-request-id"],
+            max_age=600,
+        ),
+    ),
+}
+
+
+async def _run_scenario(scenario: str, rounds: int) -> Dict[str, float]:
+    app = SCENARIOS[scenario]()
+    await start(app)
+    timings = {}
+    for kind, spec in REQUESTS.items():
+        headers: Headers = spec["headers"]
+        timings[kind] = await measure(
+            app, spec["method"], "/items", headers, rounds
+        )
+    return timings
+
+
+def run_scenario(scenario: str, rounds: int) -> Dict[str, float]:
+    return asyncio.run(_run_scenario(scenario, rounds))
+
+
+def run(rounds: int) -> List[Dict[str, Any]]:
+    timings = {
+        scenario: isolated(run_scenario, scenario, rounds)
+        for scenario in SCENARIOS
+    }
+
+    baseline = timings["baseline"]
+    return [
+        {
+            "scenario": scenario,
+            "request": kind,
+            "us_per_request": round(seconds * 1e6, 2),
+            "overhead_us": round((seconds - baseline[kind]) * 1e6, 2),
+        }
+        for scenario, results in timings.items()
+        for kind, seconds in results.items()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--output", default="cors_benchmark.json")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    for row in results:
+        print(
+            f"{row['scenario']:>15} {row['request']:>12}: "
+            f"{row['us_per_request']:8.1f} us "
+            f"({row['overhead_us']:+7.1f} us)"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "sanic": __version__,
+                "rounds": args.rounds,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the routed CORS preflight path against CORS_FAST_PREFLIGHT.
+
+    python -m benchmarks.cors_preflight
+"""
+import asyncio
+from typing import Any, Dict, Tuple
+
+from sanic import Sanic
+from sanic.response import text
+
+from sanic_ext.bootstrap import Extend
+
+from .utils import isolated, measure, request, start
+
+ROUNDS = 5000
+PREFLIGHT_HEADERS = [
+    (b"origin", b"https://app.example.com"),
+    (b"access-control-request-method", b"POST"),
+    (b"access-control-request-headers", b"content-type, x-request-id"),
+]
+
+
+def make_app(fast_preflight: bool) -> Sanic:
+    app = Sanic(f"preflight_{'fast' if fast_preflight else 'routed'}")
+    Extend(
+        app,
+        config={
+            "cors_origins": "https://app.example.com,https://admin.example.com",
+            "cors_allow_headers": "content-type,x-request-id",
+            "cors_max_age": 600,
+            "cors_fast_preflight": fast_preflight,
+            "oas": False,
+        },
+    )
+
+    @app.route("/items", methods=["GET", "POST"])
+    async def items(request):
+        return text("")
+
+    return app
+
+
+async def _run(fast_preflight: bool) -> Tuple[Dict[str, Any], float]:
+    app = make_app(fast_preflight)
+    await start(app)
+    response = await request(app, "OPTIONS", "/items", PREFLIGHT_HEADERS)
+    per_request = await measure(
+        app, "OPTIONS", "/items", PREFLIGHT_HEADERS, ROUNDS
+    )
+    return response, per_request
+
+
+def run(fast_preflight: bool) -> Tuple[Dict[str, Any], float]:
+    return asyncio.run(_run(fast_preflight))
+
+
+def main() -> None:
+    responses = []
+    for name, fast_preflight in (("routed", False), ("fast", True)):
+        response, per_request = isolated(run, fast_preflight)
+        responses.append(response)
+        print(f"{name:>8}: {per_request * 1e6:8.1f} us/request")
+
+    assert responses[0] == responses[1], responses
+
+
+if __name__ == "__main__":
+    main()
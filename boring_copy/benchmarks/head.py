@@ -0,0 +1,74 @@
+"""
+HEAD latency for a large JSON listing, with and without a head_metadata
+path on the GET handler.
+
+    python -m benchmarks.head
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, Tuple
+
+from sanic import Sanic
+from sanic.response import raw
+
+from sanic_ext.bootstrap import Extend
+from sanic_ext.extensions.http.methods import head_metadata
+
+from .utils import isolated, measure, request, start
+
+ROUNDS = 500
+ITEMS = [{"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(20000)]
+SIZE = len(json.dumps(ITEMS))
+ETAG = hashlib.md5(str(len(ITEMS)).encode()).hexdigest()
+
+
+def listing_metadata(request):
+    return {
+        "content-type": "application/json",
+        "content-length": str(SIZE),
+        "etag": ETAG,
+    }
+
+
+def make_app(with_metadata: bool) -> Sanic:
+    app = Sanic(f"head_{'metadata' if with_metadata else 'get'}")
+    Extend(app, config={"oas": False})
+
+    async def listing(request):
+        return raw(
+            json.dumps(ITEMS),
+            content_type="application/json",
+            headers={"etag": ETAG},
+        )
+
+    if with_metadata:
+        listing = head_metadata(listing_metadata)(listing)
+    app.get("/items")(listing)
+    return app
+
+
+async def _run(with_metadata: bool) -> Tuple[Dict[str, Any], float]:
+    app = make_app(with_metadata)
+    await start(app)
+    response = await request(app, "HEAD", "/items", [])
+    per_request = await measure(app, "HEAD", "/items", [], ROUNDS)
+    return response, per_request
+
+
+def run(with_metadata: bool) -> Tuple[Dict[str, Any], float]:
+    return asyncio.run(_run(with_metadata))
+
+
+def main() -> None:
+    responses = []
+    for name, with_metadata in (("get", False), ("metadata", True)):
+        response, per_request = isolated(run, with_metadata)
+        responses.append(response)
+        print(f"{name:>9}: {per_request * 1e6:10.1f} us/request")
+
+    assert responses[0] == responses[1], responses
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Cost of ``html_params`` on attribute sets typical of rendered form fields,
+compared to the implementation that called ``clean_key`` and
+``str.format`` for every attribute.
+
+    python -m benchmarks.html_params --rounds 100000 --output html_params.json
+"""
+import argparse
+import json
+import platform
+from timeit import timeit
+from typing import Any, Dict, List
+
+from markupsafe import escape
+
+from wtforms.widgets.core import html_params
+
+
+def format_clean_key(key: str):
+    key = key.rstrip("_")
+    if key.startswith("data_") or key.startswith("aria_"):
+        key = key.replace("_", "-")
+    return key
+
+
+def format_html_params(**kwargs):
+    params = []
+    for k, v in sorted(kwargs.items()):
+        k = format_clean_key(k)
+        if v is True:
+            params.append(k)
+        elif v is False:
+            pass
+        else:
+            params.append('{}="{}"'.format(str(k), escape(v)))
+
+    return " ".join(params)
+
+
+ATTRIBUTES: Dict[str, Dict[str, Any]] = {
+    "text_input": {
+        "id": "email",
+        "name": "email",
+        "type": "email",
+        "value": "someone@example.com",
+        "required": True,
+        "maxlength": 254,
+    },
+    "checkbox": {
+        "id": "remember",
+        "name": "remember",
+        "type": "checkbox",
+        "value": "y",
+        "checked": True,
+        "disabled": False,
+    },
+    "styled": {
+        "id": "search",
+        "name": "q",
+        "class_": "form-control form-control-lg",
+        "placeholder": "Search <products> & \"brands\"",
+        "data_controller": "search",
+        "data_action": "input->search#update",
+        "aria_label": "Search",
+        "autocomplete": "off",
+    },
+    "option": {"value": "FR", "selected": True},
+}
+
+
+def run(rounds: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, attributes in ATTRIBUTES.items():
+        for implementation, func in (
+            ("format", format_html_params),
+            ("fast_path", html_params),
+        ):
+            seconds = timeit(lambda: func(**attributes), number=rounds)
+            results.append(
+                {
+                    "attributes": name,
+                    "implementation": implementation,
+                    "us_per_call": round(seconds / rounds * 1e6, 3),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--output", default="html_params_benchmark.json")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    for row in results:
+        print(
+            f"{row['attributes']:>12} {row['implementation']:>10}: "
+            f"{row['us_per_call']:8.3f} us"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "rounds": args.rounds,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Time and peak memory of ``remove_nulls`` on deep and wide documents.
+
+The plain recursive implementation it replaced is kept here as the
+baseline. It cannot go deeper than the recursion limit, so the deep
+document stays below it. ``remove_nulls`` itself switches to an explicit
+stack below a fixed depth.
+
+    python -m benchmarks.remove_nulls --rounds 20 --output remove_nulls.json
+"""
+import argparse
+import json
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from sanic_ext.utils.route import remove_nulls
+
+
+def recursive_remove_nulls(dictionary, deep=True):
+    return {
+        k: recursive_remove_nulls(v, deep) if deep and type(v) is dict else v
+        for k, v in dictionary.items()
+        if v is not None
+    }
+
+
+def deep_document(depth: int = 400) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    node = root
+    for i in range(depth):
+        node["description"] = None
+        node["name"] = f"level{i}"
+        node["child"] = {}
+        node = node["child"]
+    return root
+
+
+def wide_document(width: int = 3000) -> Dict[str, Any]:
+    return {
+        "paths": {
+            f"/items/{i}": {
+                "get": {
+                    "summary": f"Item {i}",
+                    "description": None,
+                    "deprecated": None,
+                    "responses": {"200": {"description": "OK", "links": None}},
+                }
+            }
+            for i in range(width)
+        }
+    }
+
+
+DOCUMENTS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "deep": deep_document,
+    "wide": wide_document,
+}
+IMPLEMENTATIONS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "recursive": recursive_remove_nulls,
+    "copy": remove_nulls,
+    "in_place": lambda document: remove_nulls(document, in_place=True),
+}
+
+
+def _measure(
+    implementation: Callable[[Dict[str, Any]], Any],
+    factory: Callable[[], Dict[str, Any]],
+    rounds: int,
+) -> Dict[str, float]:
+    elapsed = 0.0
+    for _ in range(rounds):
+        document = factory()
+        start = perf_counter()
+        implementation(document)
+        elapsed += perf_counter() - start
+
+    document = factory()
+    tracemalloc.start()
+    implementation(document)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms_per_call": elapsed / rounds * 1000, "peak_kib": peak / 1024}
+
+
+def run(rounds: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "document": document,
+            "implementation": implementation,
+            **{
+                key: round(value, 2)
+                for key, value in _measure(func, factory, rounds).items()
+            },
+        }
+        for document, factory in DOCUMENTS.items()
+        for implementation, func in IMPLEMENTATIONS.items()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output", default="remove_nulls_benchmark.json")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    for row in results:
+        print(
+            f"{row['document']:>5} {row['implementation']:>10}: "
+            f"{row['ms_per_call']:8.2f} ms {row['peak_kib']:10.1f} KiB"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "rounds": args.rounds,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
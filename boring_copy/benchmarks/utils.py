@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+from sanic import Sanic
+
+Headers = List[Tuple[bytes, bytes]]
+T = TypeVar("T")
+
+
+def isolated(func: Callable[..., T], *args: Any) -> T:
+    """
+    Call ``func(*args)`` in a fresh interpreter and return its result.
+    Extensions are singletons per process, so every app built through
+    ``Extend`` has to be measured in a process of its own.
+    """
+    context = get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args).result()
+
+
+async def start(app: Sanic) -> None:
+    """
+    Run the startup listeners without a server. Sanic rewrites its request
+    handling per app on startup, so apps are started and measured one at a
+    time.
+    """
+    Sanic.test_mode = True
+    app.asgi = True
+    await app._startup()
+    await app._server_event("init", "before")
+
+
+async def request(
+    app: Sanic, method: str, path: str, headers: Headers
+) -> Dict[str, Any]:
+    """
+    Send a single request through the app's ASGI interface and return the
+    collected response status and headers. Like an ASGI server, it adds a
+    content-length from the body when the app did not set one.
+    """
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+    }
+    result: Dict[str, Any] = {}
+    response_headers: List[Tuple[str, str]] = []
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            response_headers.extend(
+                (key.decode(), value.decode())
+                for key, value in message["headers"]
+                if key != b"connection"
+            )
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    if result.get("status") not in (204, 304) and all(
+        key != "content-length" for key, _ in response_headers
+    ):
+        response_headers.append(("content-length", str(size)))
+    result["headers"] = sorted(response_headers)
+    return result
+
+
+async def measure(
+    app: Sanic, method: str, path: str, headers: Headers, rounds: int
+) -> float:
+    """
+    Average wall time of a request, in seconds.
+    """
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        await request(app, method, path, headers)
+    return (time.perf_counter() - start_time) / rounds
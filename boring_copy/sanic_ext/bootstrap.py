@@ -1,24 +1,52 @@
 import typing as t
+from time import perf_counter
+
 from sanic import Sanic, __version__
 from sanic.exceptions import SanicException
 from sanic.log import logger
+from sanic.request import Request
 
-from .config import add_fallback_config, Config
+from .config import add_fallback_config, Config, ConfigSnapshot
 from .extensions.base import Extension
-from .extensions.injection.extension import InjectionExtension
-from .extensions.injection.registry import InjectionRegistry
-from .extensions.openapi.extension import OpenAPIExtension
-from .extensions.http.extension import HTTPExtension
+
+if t.TYPE_CHECKING:
+    from .extensions.injection.metrics import InjectionMetrics
+    from .extensions.injection.registry import InjectionRegistry, InjectionScope
 
 MIN_SUPPORT = (21, 3, 2)
 
+Extension.register_lazy(
+    "injection",
+    "sanic_ext.extensions.injection.extension.InjectionExtension",
+)
+Extension.register_lazy(
+    "openapi",
+    "sanic_ext.extensions.openapi.extension.OpenAPIExtension",
+    gate=lambda config: config.OAS,
+)
+Extension.register_lazy(
+    "http",
+    "sanic_ext.extensions.http.extension.HTTPExtension",
+    gate=lambda config: any(
+        (
+            config.CORS,
+            config.HTTP_ALL_METHODS,
+            config.HTTP_AUTO_HEAD,
+            config.HTTP_AUTO_OPTIONS,
+            config.HTTP_AUTO_TRACE,
+        )
+    ),
+)
+BUILT_IN_EXTENSIONS = ("injection", "openapi", "http")
+
+
 class Extend:
 
     def __init__(
             self,
             app: Sanic,
             *,
-            extensions: t.Optional[t.List[t.Type[Extension]]] = None,
+            extensions: t.Optional[t.List[t.Union[str, t.Type[Extension]]]] = None,
             built_in_extensions: bool = True,
             config: t.Optional[t.Union[Config, t.Dict[str, t.Any]]] = None,
             **kwargs
@@ -35,33 +63,81 @@ class Extend:
                 f"It looks like you are running {__version__}"
             )
         self.app = app
-        self._injection_registry: t.Optional[InjectionRegistry] = None
+        self._injection_registry: t.Optional["InjectionRegistry"] = None
+        self.injection_metrics: t.Optional["InjectionMetrics"] = None
+        self.timings: t.Dict[str, t.Dict[str, float]] = {}
         app.ctx.ext = self
 
         if not isinstance(config, Config):
             config = Config.from_dict(config or {})
         self.config = add_fallback_config(app, config, **kwargs)
+        self.snapshot = ConfigSnapshot.from_config(app.config)
 
-        if not extensions:
-            extensions = []
-
+        extensions = list(extensions or [])
         if built_in_extensions:
-            extensions.extend(
-                [
-                    InjectionExtension,
-                    OpenAPIExtension,
-                    HTTPExtension
-                ]
-            )
+            extensions.extend(BUILT_IN_EXTENSIONS)
+
         init_logs = ["Sanic Extensions:"]
-        for extclass in extensions[::-1]:
+        for ext in extensions[::-1]:
+            start = perf_counter()
+            extclass = (
+                Extension.load(ext, self.config) if isinstance(ext, str) else ext
+            )
+            import_time = perf_counter() - start
+            if extclass is None:
+                init_logs.append(f"  > {ext} [disabled]")
+                continue
+
+            start = perf_counter()
             extension = extclass(app, self.config)
             extension._startup(self)
-            init_logs.append(f"  > {extension.name} {extension.labels()}")
+            startup_time = perf_counter() - start
+
+            self.timings[extension.name] = {
+                "import": import_time,
+                "startup": startup_time,
+            }
+            init_logs.append(
+                f"  > {extension.name} {extension.labels()} "
+                f"(import {import_time * 1000:.1f}ms, "
+                f"startup {startup_time * 1000:.1f}ms)"
+            )
 
         list(map(logger.info, init_logs))
 
-    def injection(self, type: t.Type, constructor: t.Optional[t.Callable[..., t.Any]] = None):
+    def injection(
+            self,
+            type: t.Type,
+            constructor: t.Optional[t.Callable[..., t.Any]] = None,
+            *,
+            scope: t.Union["InjectionScope", str] = "transient",
+            teardown: t.Optional[t.Callable[[t.Any], t.Any]] = None
+    ):
+        """
+        Inject ``type`` into handlers that annotate a parameter with it.
+
+        ``constructor`` is called as ``constructor(request, **dependencies)``
+        for the ``worker``, ``request`` and ``transient`` scopes, and as
+        ``constructor(**dependencies)`` for the ``app`` scope, which is
+        built without a request. Loop-bound resources must not use the
+        ``app`` scope, see ``InjectionScope``. ``teardown`` is called with
+        each instance when its scope ends.
+        """
         if not self._injection_registry:
             raise SanicException("Injection extension not able")
-        self._injection_registry.register(type, constructor)
+        self._injection_registry.register(type, constructor, scope, teardown)
+
+    async def get_injected(self, request: Request, type: t.Type) -> t.Any:
+        """
+        The instance of ``type`` that the handler of ``request`` is, or
+        would be, injected with, for middleware and other code outside of
+        handlers. Scoped instances are shared with the handler and built on
+        first use.
+        """
+        if not self._injection_registry:
+            raise SanicException("Injection extension not able")
+        if type not in self._injection_registry:
+            raise SanicException(f"{type.__name__} is not injected")
+        from .extensions.injection.injector import get_injected
+
+        return await get_injected(request, self._injection_registry, type)
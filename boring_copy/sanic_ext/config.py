@@ -1,5 +1,7 @@
 from __future__ import annotations
 import typing as t
+from dataclasses import dataclass
+from datetime import timedelta
 
 from sanic import Sanic
 from sanic.config import Config as SanicConfig
@@ -11,12 +13,16 @@ class Config(SanicConfig):
             self,
             cors: bool = True,
             cors_allow_headers: str = "*",
+            cors_allow_headers_cache_size: int = 256,
             cors_always_send: bool = True,
             cors_automatic_options: bool = True,
             cors_expose_headers: str = "",
+            cors_fast_preflight: bool = False,
             cors_max_age: int = 5,
             cors_methods: str = "",
+            cors_origin_cache_size: int = 1024,
             cors_origins: str = "",
+            cors_preflight_cache_size: int = 256,
             cors_send_wildcard: bool = False,
             cors_supports_credentials: bool = False,
             cors_vary_header: bool = True,
@@ -24,6 +30,8 @@ class Config(SanicConfig):
             http_auto_head: bool = True,
             http_auto_options: bool = True,
             http_auto_trace: bool = False,
+            injection_metrics: bool = False,
+            injection_metrics_uri: t.Optional[str] = None,
             oas: bool = True,
             oas_autodoc: bool = True,
             oas_ignore_head: bool = True,
@@ -38,18 +46,24 @@ class Config(SanicConfig):
             oas_uri_to_swagger: str = "/swagger",
             oas_uri_to_redoc: str = "/redoc",
             oas_url_prefix: str = "/docs",
+            prefork_startup: bool = False,
             swagger_ui_configuration: t.Optional[t.Dict[str, t.Any]] = None,
             trace_excluded_headers: t.Sequence[str] = ("authorization", "cookie"),
+            trace_stream_threshold: int = 64 * 1024,
             **kwargs
     ):
         self.CORS = cors
         self.CORS_ALLOW_HEADERS = cors_allow_headers
+        self.CORS_ALLOW_HEADERS_CACHE_SIZE = cors_allow_headers_cache_size
         self.CORS_ALWAYS_SEND = cors_always_send
         self.CORS_AUTOMATIC_OPTIONS = cors_automatic_options
         self.CORS_EXPOSE_HEADERS = cors_expose_headers
+        self.CORS_FAST_PREFLIGHT = cors_fast_preflight
         self.CORS_MAX_AGE = cors_max_age
         self.CORS_METHODS = cors_methods
+        self.CORS_ORIGIN_CACHE_SIZE = cors_origin_cache_size
         self.CORS_ORIGINS = cors_origins
+        self.CORS_PREFLIGHT_CACHE_SIZE = cors_preflight_cache_size
         self.CORS_SEND_WILDCARD = cors_send_wildcard
         self.CORS_SUPPORTS_CREDENTIALS = cors_supports_credentials
         self.CORS_VARY_HEADER = cors_vary_header
@@ -57,6 +71,8 @@ class Config(SanicConfig):
         self.HTTP_AUTO_HEAD = http_auto_head
         self.HTTP_AUTO_OPTIONS = http_auto_options
         self.HTTP_AUTO_TRACE = http_auto_trace
+        self.INJECTION_METRICS = injection_metrics
+        self.INJECTION_METRICS_URI = injection_metrics_uri
         self.OAS = oas
         self.OAS_AUTODOC = oas_autodoc
         self.OAS_IGNORE_HEAD = oas_ignore_head
@@ -71,12 +87,14 @@ class Config(SanicConfig):
         self.OAS_URI_TO_REDOC = oas_uri_to_redoc
         self.OAS_URI_TO_SWAGGER = oas_uri_to_swagger
         self.OAS_URL_PREFIX = oas_url_prefix
+        self.PREFORK_STARTUP = prefork_startup
         self.SWAGGER_UI_CONFIGURATION = swagger_ui_configuration or {
             "apisSorter": "alpha",
             "operationsSorter": "alpha",
             "docExpansion": "full"
         }
         self.TRACE_EXCLUDED_HEADERS = trace_excluded_headers
+        self.TRACE_STREAM_THRESHOLD = trace_stream_threshold
 
         if isinstance(self.TRACE_EXCLUDED_HEADERS, str):
             self.TRACE_EXCLUDED_HEADERS = tuple(
@@ -99,3 +117,101 @@ def add_fallback_config(
         {key: value for key, value in config.items() if key not in app.config}
     )
     return config
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    The resolved extension settings of an app, read once from
+    ``app.config`` after the fallback config has been applied. Header lists
+    are frozensets of lower-cased names and ``CORS_MAX_AGE`` is already a
+    header value, so nothing needs to be parsed again after startup.
+    """
+
+    __slots__ = (
+        "cors",
+        "cors_allow_headers",
+        "cors_allow_headers_cache_size",
+        "cors_always_send",
+        "cors_automatic_options",
+        "cors_expose_headers",
+        "cors_fast_preflight",
+        "cors_max_age",
+        "cors_methods",
+        "cors_origin_cache_size",
+        "cors_origins",
+        "cors_preflight_cache_size",
+        "cors_send_wildcard",
+        "cors_supports_credentials",
+        "cors_vary_header",
+        "injection_metrics",
+        "injection_metrics_uri",
+        "prefork_startup",
+        "server_name",
+        "trace_excluded_headers",
+        "trace_stream_threshold",
+    )
+
+    cors: bool
+    cors_allow_headers: t.FrozenSet[str]
+    cors_allow_headers_cache_size: int
+    cors_always_send: bool
+    cors_automatic_options: bool
+    cors_expose_headers: t.FrozenSet[str]
+    cors_fast_preflight: bool
+    cors_max_age: str
+    cors_methods: t.FrozenSet[str]
+    cors_origin_cache_size: int
+    cors_origins: t.Any
+    cors_preflight_cache_size: int
+    cors_send_wildcard: bool
+    cors_supports_credentials: bool
+    cors_vary_header: bool
+    injection_metrics: bool
+    injection_metrics_uri: t.Optional[str]
+    prefork_startup: bool
+    server_name: str
+    trace_excluded_headers: t.FrozenSet[str]
+    trace_stream_threshold: int
+
+    @classmethod
+    def from_config(cls, config: SanicConfig) -> "ConfigSnapshot":
+        return cls(
+            cors=config.CORS,
+            cors_allow_headers=_to_frozenset(config.CORS_ALLOW_HEADERS),
+            cors_allow_headers_cache_size=config.CORS_ALLOW_HEADERS_CACHE_SIZE,
+            cors_always_send=config.CORS_ALWAYS_SEND,
+            cors_automatic_options=config.CORS_AUTOMATIC_OPTIONS,
+            cors_expose_headers=_to_frozenset(config.CORS_EXPOSE_HEADERS),
+            cors_fast_preflight=config.CORS_FAST_PREFLIGHT,
+            cors_max_age=_to_max_age(config.CORS_MAX_AGE),
+            cors_methods=_to_frozenset(config.CORS_METHODS),
+            cors_origin_cache_size=config.CORS_ORIGIN_CACHE_SIZE,
+            cors_origins=config.CORS_ORIGINS,
+            cors_preflight_cache_size=config.CORS_PREFLIGHT_CACHE_SIZE,
+            cors_send_wildcard=config.CORS_SEND_WILDCARD,
+            cors_supports_credentials=config.CORS_SUPPORTS_CREDENTIALS,
+            cors_vary_header=config.CORS_VARY_HEADER,
+            injection_metrics=config.INJECTION_METRICS,
+            injection_metrics_uri=config.INJECTION_METRICS_URI,
+            prefork_startup=config.PREFORK_STARTUP,
+            server_name=config.get("SERVER_NAME") or "",
+            trace_excluded_headers=_to_frozenset(
+                config.TRACE_EXCLUDED_HEADERS
+            ),
+            trace_stream_threshold=config.TRACE_STREAM_THRESHOLD,
+        )
+
+
+def _to_frozenset(value: t.Any) -> t.FrozenSet[str]:
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        value = value.split(",")
+    return frozenset(item.strip().lower() for item in value if item.strip())
+
+
+def _to_max_age(value: t.Any) -> str:
+    if isinstance(value, timedelta):
+        return str(int(value.total_seconds()))
+    return str(value or "")
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Type
+from importlib import import_module
+from typing import Callable, Dict, Optional, Type, Union
 
 from sanic import Sanic
 from sanic.config import Config
@@ -15,7 +16,8 @@ class NoDuplicationDict(dict):
 
 
 class Extension(ABC):
-    _name_register: Dict[str, Type["Extension"]] = NoDuplicationDict()
+    _name_register: Dict[str, Union[str, Type["Extension"]]] = NoDuplicationDict()
+    _gates: Dict[str, Callable[[Config], bool]] = {}
     _singleton = None
     name: str
 
@@ -30,10 +32,40 @@ class Extension(ABC):
             raise InitError(
                 "Extensions must be named, and may only contain alphabetic characters"
             )
-        if cls.name in cls._name_register:
+        registered = cls._name_register.get(cls.name)
+        if registered is not None and not isinstance(registered, str):
             raise InitError(f"Extension '{cls.name}' already exists")
 
-        cls._name_register[cls.name] = cls
+        dict.__setitem__(cls._name_register, cls.name, cls)
+
+    @classmethod
+    def register_lazy(
+        cls,
+        name: str,
+        path: str,
+        gate: Optional[Callable[[Config], bool]] = None,
+    ) -> None:
+        """
+        Register an extension by the dotted path of its class so that it is
+        only imported when ``load`` is called. ``gate`` decides from the
+        config whether the extension is needed at all. A class that was
+        already imported and registered under ``name`` is kept.
+        """
+        if isinstance(cls._name_register.get(name, path), str):
+            dict.__setitem__(cls._name_register, name, path)
+        if gate:
+            cls._gates[name] = gate
+
+    @classmethod
+    def load(cls, name: str, config: Config) -> Optional[Type["Extension"]]:
+        gate = cls._gates.get(name)
+        if gate and not gate(config):
+            return None
+        extension = cls._name_register[name]
+        if isinstance(extension, str):
+            module_name, _, class_name = extension.rpartition(".")
+            extension = getattr(import_module(module_name), class_name)
+        return extension
 
     def __init__(self, app: Sanic, config: Config) -> None:
         self.app = app
@@ -51,5 +83,5 @@ class Extension(ABC):
     def startup(self, bootstrap) -> None:
         ...
 
-    def label(self):
+    def labels(self):
         return ""
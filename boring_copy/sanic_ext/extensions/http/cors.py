@@ -1,7 +1,7 @@
 import re
 from datetime import timedelta
 from types import SimpleNamespace
-from typing import FrozenSet, Tuple, Union, List, Any, Optional
+from typing import Dict, FrozenSet, Tuple, Union, List, Any, Optional
 
 from dataclasses import dataclass
 from sanic import Sanic
@@ -11,7 +11,11 @@ from sanic.log import logger
 from sanic.request import Request
 from sanic.response import HTTPResponse
 
-WILDCARD_PATTERN = re.compile(r".*")
+from ...config import ConfigSnapshot, _to_frozenset, _to_max_age
+from ...utils.cache import LRUCache
+from ...utils.listeners import startup_listener
+from .origins import WILDCARD_PATTERN, CORSStats, OriginMatcher
+
 ORIGIN_HEADER = "access-control-allow-origin"
 ALLOW_HEADERS_HEADER = "access-control-allow-headers"
 ALLOW_METHODS_HEADER = "access-control-allow-methods"
@@ -32,39 +36,124 @@ class CORSSettings:
     automatic_options: bool
     expose_headers: FrozenSet[str]
     max_age: str
+    origin_matcher: OriginMatcher
     send_wildcard: bool
+    stats: CORSStats
     supports_credentials: bool
 
 
+@dataclass(frozen=True)
+class CORSPlan:
+    """
+    Resolved CORS headers for a single route group. Compiled once at
+    startup so that the response hook only needs to match the origin and
+    copy the prepared values onto the response.
+    """
+
+    __slots__ = (
+        "allow_headers",
+        "allow_headers_cache",
+        "allow_headers_wildcard",
+        "allow_methods",
+        "allow_methods_with_credentials",
+        "allow_origins",
+        "always_send",
+        "automatic_options",
+        "credentials",
+        "expose_headers",
+        "expose_headers_with_credentials",
+        "fallback_origin",
+        "max_age",
+        "origin_matcher",
+        "preflight_allow",
+        "preflight_cache",
+        "send_wildcard",
+        "vary",
+    )
+
+    allow_headers: FrozenSet[str]
+    allow_headers_cache: LRUCache
+    allow_headers_wildcard: bool
+    allow_methods: str
+    allow_methods_with_credentials: str
+    allow_origins: Tuple[re.Pattern, ...]
+    always_send: bool
+    automatic_options: bool
+    credentials: bool
+    expose_headers: str
+    expose_headers_with_credentials: str
+    fallback_origin: str
+    max_age: str
+    origin_matcher: OriginMatcher
+    preflight_allow: Optional[str]
+    preflight_cache: LRUCache
+    send_wildcard: bool
+    vary: bool
+
+
 def add_cors(app: Sanic):
     _setup_cors_settings(app)
 
+    if app.ctx.ext.snapshot.cors_fast_preflight:
+
+        @app.on_request
+        async def _answer_preflight(request):
+            if request.method != "OPTIONS" or not request.route:
+                return
+            plan = getattr(request.route.ctx, "_cors_plan", None)
+            if (
+                not plan
+                or not plan.automatic_options
+                or plan.preflight_allow is None
+                or not request.headers.get(REQUEST_METHOD_HEADER)
+            ):
+                return
+            request_origin = request.headers.get("origin")
+            if not request_origin:
+                return
+            if plan.send_wildcard:
+                origin_value = "*"
+            elif plan.origin_matcher.match(request_origin):
+                origin_value = request_origin
+            else:
+                return
+
+            request.ctx._cors_preflight = True
+            headers = _get_preflight_headers(request, plan)
+            return HTTPResponse(
+                status=204,
+                headers=[
+                    headers[0], (ORIGIN_HEADER, origin_value), *headers[1:]
+                ],
+            )
+
     @app.on_response
     async def _add_cors_headers(request, response):
-        preflight = (
-            request.app.ctx.cors.automatic_options and
-            request.method == "OPTIONS"
-        )
-        if preflight and not request.header.get(REQUEST_METHOD_HEADER):
+        if getattr(request.ctx, "_cors_preflight", False):
+            return
+        plan = _get_cors_plan(request)
+        preflight = plan.automatic_options and request.method == "OPTIONS"
+        if preflight and not request.headers.get(REQUEST_METHOD_HEADER):
             logger.info(
                 "No Access-Control-Request-Method header found on request."
                 "CORS headers will not be applied"
             )
             return
-        _add_origin_header(request, response)
-        if ORIGIN_HEADER not in request.headers:
+        _add_origin_header(request, response, plan)
+        if ORIGIN_HEADER not in response.headers:
             return
 
-        _add_expose_header(request, response)
-        _add_credentials_header(request, response)
-        _add_vary_header(request, response)
+        with_credentials = _is_request_with_credentials(request)
+        _add_expose_header(response, plan, with_credentials)
+        _add_credentials_header(response, plan)
+        _add_vary_header(response, plan)
 
         if preflight:
-            _add_max_age_header(request, response)
-            _add_allow_header(request, response)
-            _add_methods_header(request, response)
+            _add_max_age_header(response, plan)
+            _add_allow_header(request, response, plan, with_credentials)
+            _add_methods_header(response, plan, with_credentials)
 
-    @app.before_server_start
+    @startup_listener(app)
     async def _assign_cors_settings(app, _):
         for group in app.router.groups.values():
             _cors = SimpleNamespace()
@@ -72,9 +161,14 @@ def add_cors(app: Sanic):
                 cors = getattr(route.handler, "__cors__", None)
                 if cors:
                     for k, v in cors.__dict__.items():
-                        setattr(_cors, k, v)
+                        if v is not _default:
+                            setattr(_cors, k, v)
+            plan = _compile_cors_plan(
+                app, _cors, group.methods, _get_preflight_allow(group)
+            )
             for route in group:
                 route.ctx._cors = _cors
+                route.ctx._cors_plan = plan
 
 
 def cors(
@@ -83,13 +177,17 @@ def cors(
         expose_headers: Union[List[str], Default] = _default,
         allow_headers: Union[List[str], Default] = _default,
         allow_methods: Union[List[str], Default] = _default,
-        supports_credentials: Union[List[bool, Default]] = _default,
+        supports_credentials: Union[bool, Default] = _default,
         max_age: Union[str, int, timedelta, Default] = _default
 ):
     def decorator(f):
         f.__cors__ = SimpleNamespace(
             _cors_origin=origin,
-            _cros_expose_headers=expose_headers,
+            _cors_expose_headers=(
+                _to_frozenset(expose_headers)
+                if expose_headers is not _default
+                else expose_headers
+            ),
             _cors_supports_credentials=supports_credentials,
             _cors_allow_origins=(
                 _parse_allow_origins(origin)
@@ -97,17 +195,17 @@ def cors(
                 else origin
             ),
             _cors_allow_headers=(
-                _parse_allow_header(allow_headers)
+                _to_frozenset(allow_headers)
                 if allow_headers is not _default
                 else allow_headers
             ),
             _cors_allow_methods=(
-                _parse_allow_methods(allow_methods)
+                _to_frozenset(allow_methods)
                 if allow_methods is not _default
                 else allow_methods
             ),
             _cors_max_age=(
-                _parse_max_age(max_age) if max_age is not _default else max_age
+                _to_max_age(max_age) if max_age is not _default else max_age
             )
         )
         return f
@@ -115,158 +213,253 @@ def cors(
 
 
 def _setup_cors_settings(app: Sanic) -> None:
-    if app.config.CORS_ORIGIN == "*" and app.config.CORS_SUPPORTS_CREDENTIALS:
+    snapshot: ConfigSnapshot = app.ctx.ext.snapshot
+    if snapshot.cors_origins == "*" and snapshot.cors_supports_credentials:
         raise SanicException(
             "Cannot use supports_credentials in conjunction with an origin"
             "string of '*'. See: http://www.w3.org/TR/cors/#resource-requests"
         )
 
-    allow_headers = _get_allow_headers(app)
-    allow_methods = _get_allow_methods(app)
-    allow_origins = _get_allow_origins(app)
-    expose_headers = _get_allow_headers(app)
-    max_age = _get_max_age(app)
+    allow_origins = _parse_allow_origins(snapshot.cors_origins)
+    stats = CORSStats()
 
     app.ctx.cors = CORSSettings(
-        allow_headers=allow_headers,
-        allow_methods=allow_methods,
+        allow_headers=snapshot.cors_allow_headers,
+        allow_methods=snapshot.cors_methods,
         allow_origins=allow_origins,
-        always_send=app.config.CORS_ALWAYS_SEND,
-        automatic_options=app.config.CORS_AUTOMATIC_OPTIONS,
-        expose_headers=expose_headers,
-        max_age=max_age,
+        always_send=snapshot.cors_always_send,
+        automatic_options=snapshot.cors_automatic_options,
+        expose_headers=snapshot.cors_expose_headers,
+        max_age=snapshot.cors_max_age,
+        origin_matcher=OriginMatcher(
+            allow_origins, snapshot.cors_origin_cache_size, stats
+        ),
         send_wildcard=(
-            app.config.CORS_SEND_WILDCARD and WILDCARD_PATTERN in allow_origins
+            snapshot.cors_send_wildcard and WILDCARD_PATTERN in allow_origins
+        ),
+        stats=stats,
+        supports_credentials=snapshot.cors_supports_credentials
+    )
+    app.ctx.cors_plan = _compile_cors_plan(app, SimpleNamespace(), frozenset())
+
+
+def _compile_cors_plan(
+    app: Sanic,
+    overrides: SimpleNamespace,
+    group_methods: FrozenSet[str],
+    preflight_allow: Optional[str] = None,
+) -> CORSPlan:
+    settings: CORSSettings = app.ctx.cors
+    snapshot: ConfigSnapshot = app.ctx.ext.snapshot
+
+    def resolve(key: str, default: Any) -> Any:
+        return getattr(overrides, key, default)
+
+    allow_origins = resolve("_cors_allow_origins", settings.allow_origins)
+    origin = resolve("_cors_origin", snapshot.cors_origins)
+    allow_headers = resolve("_cors_allow_headers", settings.allow_headers)
+    allow_methods = resolve("_cors_allow_methods", settings.allow_methods)
+    expose_headers = resolve("_cors_expose_headers", settings.expose_headers)
+
+    if WILDCARD_PATTERN in allow_origins:
+        fallback_origin = "*"
+    elif isinstance(origin, str) and origin and "," not in origin:
+        fallback_origin = origin
+    else:
+        fallback_origin = snapshot.server_name
+
+    if allow_origins is settings.allow_origins:
+        origin_matcher = settings.origin_matcher
+    else:
+        origin_matcher = OriginMatcher(
+            allow_origins, snapshot.cors_origin_cache_size, settings.stats
+        )
+
+    if allow_methods:
+        methods = [
+            method for method in sorted(group_methods)
+            if method.lower() in allow_methods
+        ]
+    else:
+        methods = sorted(group_methods)
+    methods_value = ",".join(methods)
+
+    return CORSPlan(
+        allow_headers=allow_headers,
+        allow_headers_cache=LRUCache(snapshot.cors_allow_headers_cache_size),
+        allow_headers_wildcard="*" in allow_headers,
+        allow_methods="*" if "*" in allow_methods else methods_value,
+        allow_methods_with_credentials=methods_value,
+        allow_origins=allow_origins,
+        always_send=settings.always_send,
+        automatic_options=settings.automatic_options,
+        credentials=resolve(
+            "_cors_supports_credentials", settings.supports_credentials
         ),
-        supports_credentials=app.config.CORS_SUPPORTS_CREDENTIALS
+        expose_headers=(
+            "*" if "*" in expose_headers else ",".join(sorted(expose_headers))
+        ),
+        expose_headers_with_credentials=",".join(sorted(expose_headers)),
+        fallback_origin=fallback_origin,
+        max_age=resolve("_cors_max_age", settings.max_age),
+        origin_matcher=origin_matcher,
+        preflight_allow=preflight_allow,
+        preflight_cache=LRUCache(snapshot.cors_preflight_cache_size),
+        send_wildcard=settings.send_wildcard,
+        vary=len(allow_origins) > 1,
     )
 
 
-def _get_from_cors_ctx(request: Request, key: str, default: Any = None):
+def _get_preflight_allow(group) -> Optional[str]:
+    options_route = next(
+        (route for route in group if "OPTIONS" in route.methods), None
+    )
+    if not options_route:
+        return None
+    handler = options_route.handler
+    if not getattr(handler, "__auto_options__", False):
+        return None
+    return handler.keywords["allow"]
+
+
+def _get_preflight_headers(
+    request: Request, plan: CORSPlan
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Headers of a short-circuited preflight response, in the same order the
+    routed path would add them. The first entry is the ``allow`` header;
+    the allowed origin is inserted after it by the caller.
+    """
+    with_credentials = _is_request_with_credentials(request)
+    key = (with_credentials, request.headers.get(REQUEST_HEADERS_HEADER, ""))
+    headers = plan.preflight_cache.get(key)
+    if headers is not None:
+        return headers
+
+    values: Dict[str, str] = {"allow": plan.preflight_allow}
+    expose_headers = (
+        plan.expose_headers_with_credentials
+        if with_credentials
+        else plan.expose_headers
+    )
+    if expose_headers:
+        values[EXPOSE_HEADER] = expose_headers
+    if plan.credentials:
+        values[CREDENTIALS_HEADER] = "true"
+    if plan.vary:
+        values[VARY_HEADER] = "origin"
+    if plan.max_age:
+        values[MAX_AGE_HEADER] = plan.max_age
+    allow_headers = _get_allow_headers_value(request, plan, with_credentials)
+    if allow_headers:
+        values[ALLOW_HEADERS_HEADER] = allow_headers
+    methods = (
+        plan.allow_methods_with_credentials
+        if with_credentials
+        else plan.allow_methods
+    )
+    if methods:
+        values[ALLOW_METHODS_HEADER] = methods
+
+    headers = tuple(values.items())
+    plan.preflight_cache[key] = headers
+    return headers
+
+
+def _get_cors_plan(request: Request) -> CORSPlan:
     if request.route:
-        value = getattr(request.route.ctx._cors, key, default)
-        if value is not _default:
-            return value
-    return value
+        plan = getattr(request.route.ctx, "_cors_plan", None)
+        if plan:
+            return plan
+    return request.app.ctx.cors_plan
 
 
-def _add_origin_header(request: Request, response: HTTPResponse):
+def _add_origin_header(
+    request: Request, response: HTTPResponse, plan: CORSPlan
+) -> None:
     request_origin = request.headers.get("origin")
     origin_value = ""
-    allow_origins = _get_from_cors_ctx(
-        request,
-        "_cors_allow_origins",
-        request.app.ctx.cors.allow_origins
-    )
-    fallback_origin = _get_from_cors_ctx(
-        request,
-        "_cors_origin",
-        request.app.config.CORS_ORIGINS
-    )
     if request_origin:
-        if request.app.ctx.cors.send_wildcard:
-            origin_value = "*"
-        else:
-            for pattern in allow_origins:
-                if pattern.match(request_origin):
-                    origin_value = request_origin
-    elif request.app.ctx.cors.always_send:
-        if WILDCARD_PATTERN in allow_origins:
+        if plan.send_wildcard:
             origin_value = "*"
-        else:
-            if isinstance(fallback_origin, str) and "," not in fallback_origin:
-                origin_value = fallback_origin
-            else:
-                origin_value = request.app.config.get("SEVER_NAME", "")
+        elif plan.origin_matcher.match(request_origin):
+            origin_value = request_origin
+    elif plan.always_send:
+        origin_value = plan.fallback_origin
     if origin_value:
-        response.headers["ORIGIN_HEADER"] = origin_value
+        response.headers[ORIGIN_HEADER] = origin_value
 
 
-def _add_expose_header(request: Request, response: HTTPResponse):
-    with_credentials = _is_request_with_credentials(request)
-    headers = None
-    expose_headers = _get_from_cors_ctx(
-        request, "_cors_expose_headers", request.app.ctx.cors.expose_headers
+def _add_expose_header(
+    response: HTTPResponse, plan: CORSPlan, with_credentials: bool
+) -> None:
+    headers = (
+        plan.expose_headers_with_credentials
+        if with_credentials
+        else plan.expose_headers
     )
-    if not with_credentials and "*" in expose_headers:
-        headers = ["*"]
-    elif expose_headers:
-        headers = expose_headers
-
     if headers:
-        response.headers[EXPOSE_HEADER] = ",".join(headers)
+        response.headers[EXPOSE_HEADER] = headers
 
 
-def _add_credentials_header(request: Request, response: HTTPResponse) -> None:
-    supports_credentials = _get_from_cors_ctx(
-        request,
-        "_cors_support_credentials",
-        request.app.ctx.cors.suppoerts_credentials
-    )
-    if supports_credentials:
+def _add_credentials_header(response: HTTPResponse, plan: CORSPlan) -> None:
+    if plan.credentials:
         response.headers[CREDENTIALS_HEADER] = "true"
 
 
-def _add_allow_header(request: Request, response: HTTPResponse):
-    with_credentials = _is_request_with_credentials(request)
-    request_headers = set(
-        h.strip().lower() for h in request.headers.get("REQUEST_HEADERS_HEADER", "").split(",")
-    )
-    allow_headers = _get_from_cors_ctx(
-        request, "_cors_allow_headers", request.app.ctx.cors.allow_headers
-    )
-
-    if not with_credentials and "*" in allow_headers:
-        allow_headers = ["*"]
-    else:
-        allow_headers = request_headers & allow_headers
-
+def _add_allow_header(
+    request: Request,
+    response: HTTPResponse,
+    plan: CORSPlan,
+    with_credentials: bool,
+) -> None:
+    allow_headers = _get_allow_headers_value(request, plan, with_credentials)
     if allow_headers:
-        response.headers[ALLOW_HEADERS_HEADER] = ",".join(allow_headers)
+        response.headers[ALLOW_HEADERS_HEADER] = allow_headers
+
+
+def _get_allow_headers_value(
+    request: Request, plan: CORSPlan, with_credentials: bool
+) -> str:
+    if not with_credentials and plan.allow_headers_wildcard:
+        return "*"
+    raw = request.headers.get(REQUEST_HEADERS_HEADER, "")
+    value = plan.allow_headers_cache.get(raw)
+    if value is None:
+        # Keep the order the client asked in, sets would vary per process
+        request_headers = dict.fromkeys(
+            h.strip().lower() for h in raw.split(",")
+        )
+        value = ",".join(
+            header for header in request_headers
+            if header in plan.allow_headers
+        )
+        plan.allow_headers_cache[raw] = value
+    return value
 
 
-def _add_max_age_header(request: Request, response: HTTPResponse) -> None:
-    max_age = _get_from_cors_ctx(
-        request, "_cors_max_age", request.app.ctx.cors.max_age
-    )
+def _add_max_age_header(response: HTTPResponse, plan: CORSPlan) -> None:
+    if plan.max_age:
+        response.headers[MAX_AGE_HEADER] = plan.max_age
 
-    if max_age:
-        response.headers[MAX_AGE_HEADER] = max_age
 
-
-def _add_methods_header(request: Request, response: HTTPResponse):
-    methods = None
-    with_credentials = _is_request_with_credentials(request)
-    allow_methods = _get_from_cors_ctx(
-        request, "_cors_allow_methods", request.app.ctx.cors.allow_methods
+def _add_methods_header(
+    response: HTTPResponse, plan: CORSPlan, with_credentials: bool
+) -> None:
+    methods = (
+        plan.allow_methods_with_credentials
+        if with_credentials
+        else plan.allow_methods
     )
-
-    if not with_credentials and "*" in allow_methods:
-        methods = {"*"}
-    elif request.route:
-        group_methods = request.app.router.groups.get(request.route.parts)
-        if allow_methods:
-            methods = group_methods & allow_methods
-        else:
-            methods = group_methods
-
     if methods:
         response.headers[ALLOW_METHODS_HEADER] = methods
 
 
-def _add_vary_header(request: Request, response: HTTPResponse):
-    allow_origins = _get_from_cors_ctx(
-        request, "_cors_allow_origins", request.app.ctx.cors.allow_origins
-    )
-    if len(allow_origins) > 1:
+def _add_vary_header(response: HTTPResponse, plan: CORSPlan) -> None:
+    if plan.vary:
         response.headers[VARY_HEADER] = "origin"
 
 
-def _get_allow_origins(app: Sanic) -> Tuple[re.Pattern, ...]:
-    origins = app.config.CORS_ORIGINS
-    return _parse_allow_origins(origins)
-
-
 def _parse_allow_origins(value: Union[str, re.Pattern]) -> Tuple[re.Pattern, ...]:
     origins: Optional[Union[List[str], List[re.Pattern]]] = None
     if value and isinstance(value, str):
@@ -281,52 +474,5 @@ def _parse_allow_origins(value: Union[str, re.Pattern]) -> Tuple[re.Pattern, ...
     )
 
 
-def _get_expose_headers(app: Sanic) -> FrozenSet[str]:
-    expose_headers = (
-        (app.config.CORS_EXPOSE_HEADERS
-        if isinstance(app.config.CORS_EXPOSE_HEADERS, (list, set, frozenset, tuple))
-        else app.config.CORS_EXPOSE_HEADERS.split(","))
-        if app.config.CORS_EXPOSE_HEADERS
-        else tuple()
-    )
-
-    return frozenset(header.lower() for header in expose_headers)
-
-
-def _get_allow_headers(app: Sanic) -> FrozenSet[str]:
-    return _parse_allow_headers(app.config.CORS_ALLOW_HEADERS)
-
-
-def _parse_allow_headers(value: str) -> FrozenSet[str]:
-    allow_headers = (
-        (value if isinstance(value, (list, set, frozenset, tuple)) else value.split(","))
-        if value else tuple()
-    )
-    return frozenset(header.lower() for header in allow_headers)
-
-
-def _get_max_age(app: Sanic) -> str:
-    return _parse_max_age(app.config.CORS_MAX_AGE or "")
-
-
-def _parse_max_age(value: Any) -> str:
-    max_age = value or ""
-    if isinstance(max_age, timedelta):
-        max_age = str(int(max_age.total_seconds()))
-    return str(max_age)
-
-
-def _get_allow_methods(app: Sanic) -> FrozenSet[str]:
-    return _parse_allow_methods(app.config.CORS_METHODS)
-
-
-def _parse_allow_methods(value) -> FrozenSet[str]:
-    allow_methods = (
-        value if isinstance(value, (list, set, frozenset, tuple)) else value.split(",")
-        if value else tuple()
-    )
-    return frozenset(method.lower() for method in allow_methods)
-
-
 def _is_request_with_credentials(request: Request):
     return bool(request.headers.get("authorization") or request.cookies)
@@ -28,7 +28,11 @@ class HTTPExtension(Extension):
         if self.cors:
             add_cors(self.app)
 
-        if self.app.ctx.cors.automatic_options and not self.auto_options:
+        if (
+            self.cors
+            and self.app.ctx.cors.automatic_options
+            and not self.auto_options
+        ):
             raise InitError(
                 "Configuration mismatch. If CORS_AUTOMATIC_OPTIONS is set to Ture,"
                 "then you must run SanicExt with auto_options=True"
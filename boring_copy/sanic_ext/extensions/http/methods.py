@@ -1,24 +1,40 @@
-from typing import Sequence, Union
+from typing import Any, Callable, Dict, FrozenSet, Sequence, Union
 from inspect import isawaitable
 from functools import partial
+from time import perf_counter
 
-from sanic.constants import HTTP_METHODS
+from sanic.constants import HTTPMethod
 from sanic import Sanic
 from sanic.exceptions import SanicException
-from sanic.response import empty, raw
+from sanic.log import logger
+from sanic.response import HTTPResponse, empty, raw, stream
 
+from ...utils.listeners import startup_listener
 from ...utils.route import clean_route_name
-from ..openapi import openapi
 
 
 def add_http_methods(
-        app: Sanic, methods: Sequence[Union[str, HTTP_METHODS]]
+        app: Sanic, methods: Sequence[Union[str, HTTPMethod]]
 ):
     app.router.ALLOWED_METHODS = tuple(
         [*app.router.ALLOWED_METHODS, *methods]
     )
 
 
+def head_metadata(metadata_handler: Callable[..., Any]):
+    """
+    Give a GET handler a cheap path for its automatic HEAD route.
+
+    ``metadata_handler`` is called with the same arguments as the GET
+    handler and returns either an ``HTTPResponse`` or a mapping of headers
+    (``content-length``, ``etag``, ...). The GET body is never built.
+    """
+    def decorator(f):
+        f.__head__ = metadata_handler
+        return f
+    return decorator
+
+
 def add_auto_handlers(
         app: Sanic, auto_head: bool, auto_options: bool, auto_trace: bool
 ):
@@ -34,73 +50,155 @@ def add_auto_handlers(
             retval = await retval
         return retval
 
-    async def options_handler(request, methods, *args, **kwargs):
-        resp = empty()
-        resp.headers["allow"] = ",".join([*methods, "OPTIONS"])
-        return resp
+    async def head_metadata_handler(
+        request, metadata_handler, *args, **kwargs
+    ):
+        retval = metadata_handler(request, *args, **kwargs)
+        if isawaitable(retval):
+            retval = await retval
+        if isinstance(retval, HTTPResponse):
+            return retval
+        return HTTPResponse(headers=retval)
+
+    async def options_handler(request, allow, *args, **kwargs):
+        return empty(headers={"allow": allow})
+
+    trace_excluded: FrozenSet[bytes] = frozenset()
+    trace_threshold = 0
 
     async def trace_handler(request):
-        cleaned_head = b""
-        for line in request.head.split(b"\r\n"):
-            first_word, _ = line.split(b" ", 1)
-            if first_word.lower().replace(b":", b"").decode("utf-8") not in request.app.config.TRACE_EXCLUDED_HEADERS:
-                cleaned_head += line + b"\r\n"
-
-            message = "\r\n\r\n".join(
-                [part.decode("utf-8") for part in [cleaned_head, request.body]]
-            )
-            return raw(message, content_type="message/http")
-
-    @app.before_server_start
+        head = request.head
+        view = memoryview(head)
+        length = len(head)
+        start = head.find(b"\r\n")
+        if start == -1:
+            start = length
+        kept = [view[:start]]
+        start += 2
+        while start < length:
+            end = head.find(b"\r\n", start)
+            if end == -1:
+                end = length
+            name_end = head.find(b":", start, end)
+            if name_end == -1:
+                name_end = end
+            if head[start:name_end].strip().lower() not in trace_excluded:
+                kept.append(view[start:end])
+            start = end + 2
+        message_head = b"\r\n".join(kept) + b"\r\n\r\n"
+
+        body = request.body
+        if len(body) < trace_threshold:
+            return raw(message_head + body, content_type="message/http")
+
+        async def stream_message(response):
+            await response.write(message_head)
+            await response.write(memoryview(body))
+
+        return stream(stream_message, content_type="message/http")
+
+    @startup_listener(app)
     def _add_handlers(app, _):
-        nonlocal auto_head
-        nonlocal auto_options
-
-        if auto_head:
-            app.router.reset()
-            for group in app.router.groups.values():
-                if "GET" in group.methods and "HEAD" not in group.methods:
-                    get_route = group.methods_index["GET"]
-                    name = f"{get_route.name}_head"
-                    app.add_route(
-                        handler=openapi.definition(
-                            sammary=clean_route_name(get_route.name).title(),
-                            description="Retrieve HEAD details"
-                        )(
-                            partial(
-                                head_handler, get_handler=get_route.handler
-                            )
-                        ),
+        nonlocal trace_excluded
+        nonlocal trace_threshold
+
+        start = perf_counter()
+        allow_values: Dict[FrozenSet[str], str] = {}
+        snapshot = app.ctx.ext.snapshot
+        trace_excluded = frozenset(
+            header.encode("utf-8")
+            for header in snapshot.trace_excluded_headers
+        )
+        trace_threshold = snapshot.trace_stream_threshold
+        routes = []
+        for group in app.router.groups.values():
+            methods = set(group.methods)
+            if auto_head and "GET" in methods and "HEAD" not in methods:
+                get_route = next(
+                    route for route in group if "GET" in route.methods
+                )
+                metadata_handler = getattr(get_route.handler, "__head__", None)
+                if metadata_handler:
+                    handler = partial(
+                        head_metadata_handler,
+                        metadata_handler=metadata_handler
+                    )
+                    handler.__injection_handler__ = metadata_handler
+                else:
+                    handler = partial(
+                        head_handler, get_handler=get_route.handler
+                    )
+                    handler.__injection_handler__ = get_route.handler
+                if app.config.OAS:
+                    # Only import the OpenAPI extension when it is enabled
+                    from ..openapi import openapi
+
+                    handler = openapi.definition(
+                        summary=clean_route_name(get_route.name).title(),
+                        description="Retrieve HEAD details"
+                    )(handler)
+                routes.append(
+                    dict(
+                        handler=handler,
                         uri=group.uri,
                         methods=["HEAD"],
-                        strict_slashes=group.strict_slashes,
-                        name=name
+                        strict_slashes=group.strict,
+                        name=f"{get_route.name}_head"
                     )
-            app.router.finalize()
+                )
+                methods.add("HEAD")
 
-        if auto_trace:
-            app.router.reset()
-            for group in app.router.groups.values():
-                if "TRACE" not in group.methods:
-                    app.add_route(
+            if auto_trace and "TRACE" not in methods:
+                routes.append(
+                    dict(
                         handler=trace_handler,
                         uri=group.uri,
                         methods=["TRACE"],
                         strict_slashes=group.strict
                     )
-            app.route.finalize()
-
-        if auto_options:
-            app.router.reset()
-            for group in app.router.groups.values():
-                if "OPTIONS" not in group.methods:
-                    app.add_route(
-                        handler=partial(
-                            options_handler, methods=group.methods
-                        ),
+                )
+                methods.add("TRACE")
+
+            if auto_options and "OPTIONS" not in methods:
+                key = frozenset(methods)
+                allow = allow_values.get(key)
+                if allow is None:
+                    allow = allow_values[key] = ",".join(
+                        [*sorted(key), "OPTIONS"]
+                    )
+                handler = partial(options_handler, allow=allow)
+                handler.__auto_options__ = True
+                routes.append(
+                    dict(
+                        handler=handler,
                         uri=group.uri,
                         methods=["OPTIONS"],
                         strict_slashes=group.strict,
                         name="_options"
                     )
+                )
+
+        if not routes:
+            return
+
+        # One finalize per method that added routes without batching
+        passes = len({route["methods"][0] for route in routes})
+        finalized = app.router.finalized
+        app.router.reset()
+        for route in routes:
+            app.add_route(**route)
+        saved = ""
+        if finalized:
+            finalize_start = perf_counter()
             app.router.finalize()
+            if passes > 1:
+                finalize_time = perf_counter() - finalize_start
+                saved = (
+                    f" (1 router finalize instead of {passes}, "
+                    f"~{finalize_time * (passes - 1) * 1000:.1f}ms saved)"
+                )
+
+        logger.info(
+            f"Sanic Extensions: added {len(routes)} automatic routes in "
+            f"{(perf_counter() - start) * 1000:.1f}ms{saved}"
+        )
@@ -0,0 +1,158 @@
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ...utils.cache import LRUCache
+
+WILDCARD_PATTERN = re.compile(r".*")
+SUBDOMAIN_MARKER = ""
+
+_LITERAL_ORIGIN = re.compile(
+    r"^(?P<scheme>[a-z][a-z0-9+\-]*)://(?P<host>(?:[a-z0-9\-:]|\\?\.)+)$",
+    re.IGNORECASE,
+)
+_SUBDOMAIN_ORIGIN = re.compile(
+    r"^(?P<scheme>[a-z][a-z0-9+\-]*)://(?:\*|\.\*)\\?\."
+    r"(?P<host>(?:[a-z0-9\-:]|\\?\.)+)$",
+    re.IGNORECASE,
+)
+
+
+class CORSStats:
+    """
+    Mutable counters shared by every origin matcher of an app, exposed at
+    ``app.ctx.cors.stats``.
+    """
+
+    __slots__ = ("origin_cache_hits", "origin_cache_misses")
+
+    def __init__(self) -> None:
+        self.origin_cache_hits = 0
+        self.origin_cache_misses = 0
+
+
+class OriginMatcher:
+    """
+    Decide whether a request origin is allowed by a set of compiled
+    ``allow_origins`` patterns.
+
+    Patterns are split by shape: plain origins are looked up in a set,
+    ``scheme://*.domain`` patterns are stored in a trie of reversed host
+    labels, and anything else is merged into as few regexes as possible.
+    Verdicts are cached per origin string in a bounded LRU.
+    """
+
+    __slots__ = (
+        "_cache",
+        "_literals",
+        "_patterns",
+        "_suffixes",
+        "stats",
+        "wildcard",
+    )
+
+    def __init__(
+        self,
+        allow_origins: Tuple[re.Pattern, ...],
+        cache_size: int,
+        stats: Optional[CORSStats] = None,
+    ) -> None:
+        self._cache = LRUCache(cache_size)
+        self.stats = stats or CORSStats()
+        self.wildcard = WILDCARD_PATTERN in allow_origins
+
+        literals = set()
+        suffixes: Dict[str, dict] = {}
+        patterns = []
+        for pattern in allow_origins:
+            if pattern is WILDCARD_PATTERN:
+                continue
+            literal = _parse_literal_origin(pattern)
+            if literal:
+                literals.add(literal)
+                continue
+            subdomain = _parse_subdomain_origin(pattern)
+            if subdomain:
+                scheme, labels = subdomain
+                node = suffixes.setdefault(scheme, {})
+                for label in labels:
+                    node = node.setdefault(label, {})
+                node[SUBDOMAIN_MARKER] = True
+                continue
+            patterns.append(pattern)
+
+        self._literals: FrozenSet[str] = frozenset(literals)
+        self._suffixes = suffixes
+        self._patterns = _merge_patterns(patterns)
+
+    def match(self, origin: str) -> bool:
+        if self.wildcard:
+            return True
+
+        verdict = self._cache.get(origin)
+        if verdict is not None:
+            self.stats.origin_cache_hits += 1
+            return verdict
+
+        self.stats.origin_cache_misses += 1
+        verdict = self._match(origin)
+        self._cache[origin] = verdict
+        return verdict
+
+    def _match(self, origin: str) -> bool:
+        normalized = origin.lower()
+        if normalized in self._literals:
+            return True
+
+        if self._suffixes:
+            scheme, _, host = normalized.partition("://")
+            node = self._suffixes.get(scheme)
+            if node and host:
+                labels = host.split(".")
+                for depth, label in enumerate(reversed(labels), 1):
+                    node = node.get(label)
+                    if node is None:
+                        break
+                    if SUBDOMAIN_MARKER in node and depth < len(labels):
+                        return True
+
+        return any(pattern.match(origin) for pattern in self._patterns)
+
+
+def _parse_literal_origin(pattern: re.Pattern) -> Optional[str]:
+    matched = _LITERAL_ORIGIN.match(pattern.pattern)
+    if not matched:
+        return None
+    host = matched.group("host").replace("\\.", ".")
+    return f"{matched.group('scheme')}://{host}".lower()
+
+
+def _parse_subdomain_origin(
+    pattern: re.Pattern,
+) -> Optional[Tuple[str, List[str]]]:
+    matched = _SUBDOMAIN_ORIGIN.match(pattern.pattern)
+    if not matched:
+        return None
+    host = matched.group("host").replace("\\.", ".").lower()
+    return matched.group("scheme").lower(), host.split(".")[::-1]
+
+
+def _merge_patterns(patterns: List[re.Pattern]) -> Tuple[re.Pattern, ...]:
+    by_flags: Dict[int, List[re.Pattern]] = {}
+    for pattern in patterns:
+        by_flags.setdefault(pattern.flags, []).append(pattern)
+
+    merged = []
+    for flags, group in by_flags.items():
+        if len(group) == 1:
+            merged.extend(group)
+            continue
+        try:
+            merged.append(
+                re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for pattern in group),
+                    flags,
+                )
+            )
+        except re.error:
+            merged.extend(group)
+    return tuple(merged)
@@ -1,5 +1,6 @@
 from ..base import Extension
 from .injector import add_injection
+from .metrics import InjectionMetrics
 from .registry import InjectionRegistry
 
 
@@ -8,5 +9,7 @@ class InjectionExtension(Extension):
 
     def startup(self, bootstrap) -> None:
         registry = InjectionRegistry()
-        add_injection(self.app, registry)
+        metrics = InjectionMetrics() if self.config.INJECTION_METRICS else None
+        add_injection(self.app, registry, metrics)
         bootstrap._injection_registry = registry
+        bootstrap.injection_metrics = metrics
@@ -0,0 +1,296 @@
+from asyncio import ensure_future, gather, shield
+from inspect import getmembers, isawaitable, isfunction
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Set,
+    Type,
+)
+
+from sanic import Sanic
+from sanic.response import json, text
+
+from ...utils.listeners import startup_listener
+from .metrics import InjectionMetrics
+from .registry import (
+    Injection,
+    InjectionRegistry,
+    InjectionScope,
+    InjectionStats,
+    SignatureRegistry,
+)
+
+
+def sequential_injection(f):
+    """
+    Build the injected arguments of a handler one after another, in the
+    order the handler declares them (after their own dependencies),
+    instead of awaiting async constructors together.
+    """
+    f.__injection_sequential__ = True
+    return f
+
+
+def add_injection(
+    app: Sanic,
+    injection_registry: InjectionRegistry,
+    metrics: Optional[InjectionMetrics] = None,
+) -> None:
+    signature_registry = _setup_signature_registry(app, injection_registry)
+    stats = injection_registry.stats
+    app.ctx.injection_stats = stats
+    app.ctx._injections = {}
+
+    if metrics is None:
+        inject = _inject
+    else:
+
+        async def inject(request, injection, kwargs, resolved, stats):
+            start = perf_counter()
+            try:
+                return await _inject(
+                    request, injection, kwargs, resolved, stats
+                )
+            finally:
+                metrics.observe(
+                    request.route.name, injection[0], perf_counter() - start
+                )
+
+        if app.ctx.ext.snapshot.injection_metrics_uri:
+
+            async def injection_metrics(request):
+                if request.args.get("format") == "json":
+                    return json(metrics.to_dict())
+                return text(
+                    metrics.to_prometheus(),
+                    content_type="text/plain; version=0.0.4",
+                )
+
+            app.add_route(
+                injection_metrics,
+                app.ctx.ext.snapshot.injection_metrics_uri,
+                methods=["GET"],
+                name="injection_metrics",
+            )
+
+    built_in_main_process = False
+
+    @app.main_process_start
+    async def setup_app_injections(app, _):
+        nonlocal built_in_main_process
+
+        built_in_main_process = True
+        injection_registry.finalize()
+        resolved: Dict[Type, Any] = {}
+        for _type in injection_registry.scoped(InjectionScope.APP):
+            resolved[_type] = await _inject(
+                None,
+                injection_registry.injection(_type),
+                {},
+                resolved,
+                stats,
+                app.ctx._injections,
+            )
+
+    @app.signal("http.routing.after")
+    async def inject_kwargs(request, route, kwargs, **_):
+        for name in (route.name, f"{route.name}_{request.method.lower()}"):
+            plan = signature_registry.get(name)
+            if plan:
+                break
+        else:
+            return
+
+        resolved: Dict[Type, Any] = {}
+        for inline, concurrent in plan.levels:
+            for injection in inline:
+                resolved[injection[0]] = await inject(
+                    request, injection, kwargs, resolved, stats
+                )
+            if len(concurrent) == 1:
+                injection = concurrent[0]
+                resolved[injection[0]] = await inject(
+                    request, injection, kwargs, resolved, stats
+                )
+            elif concurrent:
+                results = await gather(
+                    *(
+                        inject(request, injection, kwargs, resolved, stats)
+                        for injection in concurrent
+                    )
+                )
+                resolved.update(
+                    zip((injection[0] for injection in concurrent), results)
+                )
+
+        request.match_info.update(
+            {name: resolved[_type] for name, _type in plan.params}
+        )
+
+    @app.on_response
+    async def teardown_request_injections(request, _):
+        instances = getattr(request.ctx, "_injections", None)
+        if instances:
+            await _teardown(instances, injection_registry)
+
+    @app.after_server_stop
+    async def teardown_worker_injections(app, _):
+        # Workers only own the app scope when no main process built it
+        scopes = {InjectionScope.WORKER}
+        if not built_in_main_process:
+            scopes.add(InjectionScope.APP)
+        await _teardown(app.ctx._injections, injection_registry, scopes)
+
+    @app.main_process_stop
+    async def teardown_app_injections(app, _):
+        await _teardown(
+            app.ctx._injections, injection_registry, {InjectionScope.APP}
+        )
+
+
+async def get_injected(
+    request, injection_registry: InjectionRegistry, _type: Type
+) -> Any:
+    """
+    Build ``_type`` for ``request`` the way a handler argument would be.
+    Request, worker and app scoped instances, and those of their
+    dependencies, are shared with the handler whichever asks first.
+    """
+    route = request.route
+    kwargs = {
+        label: request.match_info[label]
+        for label in (route.labels if route else ())
+        if label in request.match_info
+    }
+    resolved: Dict[Type, Any] = {}
+    for level in injection_registry.resolve([_type]):
+        for injection in level:
+            resolved[injection[0]] = await _inject(
+                request, injection, kwargs, resolved, injection_registry.stats
+            )
+    return resolved[_type]
+
+
+async def _inject(
+    request,
+    injection: Injection,
+    kwargs: Dict[str, Any],
+    resolved: Dict[Type, Any],
+    stats: InjectionStats,
+    instances: Optional[Dict[Type, Awaitable]] = None,
+):
+    _type, constructor, scope, dependencies = injection
+    if dependencies:
+        kwargs = {
+            **kwargs,
+            **{param: resolved[dependency] for param, dependency in dependencies},
+        }
+
+    if scope is InjectionScope.TRANSIENT:
+        return await _do_cast(_type, constructor, request, **kwargs)
+
+    if instances is None:
+        if scope is InjectionScope.REQUEST:
+            instances = getattr(request.ctx, "_injections", None)
+            if instances is None:
+                instances = request.ctx._injections = {}
+        else:
+            instances = request.app.ctx._injections
+
+    if scope is InjectionScope.APP:
+        def build():
+            return _do_cast(
+                _type,
+                constructor,
+                None,
+                _bare=True,
+                **{param: kwargs[param] for param, _ in dependencies},
+            )
+    else:
+        def build():
+            return _do_cast(_type, constructor, request, **kwargs)
+
+    return await _get_scoped(instances, _type, build, stats)
+
+
+async def _get_scoped(
+    instances: Dict[Type, Awaitable],
+    key: Type,
+    build: Callable[[], Awaitable],
+    stats: InjectionStats,
+):
+    future = instances.get(key)
+    if future is not None:
+        stats.reused += 1
+        return await shield(future)
+
+    future = instances[key] = ensure_future(build())
+    stats.constructed += 1
+    try:
+        return await shield(future)
+    except BaseException:
+        instances.pop(key, None)
+        raise
+
+
+async def _teardown(
+    instances: Dict[Type, Awaitable],
+    injection_registry: InjectionRegistry,
+    scopes: Optional[Set[InjectionScope]] = None,
+) -> None:
+    for _type, future in list(instances.items()):
+        if scopes is not None and injection_registry.scope(_type) not in scopes:
+            continue
+        del instances[_type]
+        teardown = injection_registry.teardown(_type)
+        if (
+            not teardown
+            or not future.done()
+            or future.cancelled()
+            or future.exception()
+        ):
+            continue
+        retval = teardown(future.result())
+        if isawaitable(retval):
+            await retval
+
+
+async def _do_cast(_type, constructor, request, _bare=False, **kwargs):
+    cast = constructor if constructor else _type
+    args = [request] if constructor and not _bare else []
+    retval = cast(*args, **kwargs)
+    if isawaitable(retval):
+        retval = await retval
+    return retval
+
+
+def _setup_signature_registry(
+    app: Sanic, injection_registry: InjectionRegistry
+) -> SignatureRegistry:
+    registry = SignatureRegistry(injection_registry)
+
+    @startup_listener(app)
+    async def setup_signatures(app, _):
+        start = perf_counter()
+        injection_registry.finalize()
+        for route in app.router.routes:
+            viewclass = getattr(route.handler, "view_class", None)
+            if viewclass:
+                for name, member in getmembers(viewclass, isfunction):
+                    if name.upper() in route.methods:
+                        registry.add_handler(f"{route.name}_{name}", member)
+            else:
+                # Automatic HEAD routes inject what their GET handler takes
+                handler = getattr(
+                    route.handler, "__injection_handler__", route.handler
+                )
+                registry.add_handler(route.name, handler)
+        if app.ctx.ext.snapshot.prefork_startup:
+            registry.build_all()
+        injection_registry.stats.signature_setup_time = perf_counter() - start
+
+    return registry
@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple, Type
+
+BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+METRIC_NAME = "sanic_ext_injection_seconds"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observing a value only increments counters, so
+    nothing is allocated per observation.
+    """
+
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        cumulative = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class InjectionMetrics:
+    """
+    Time spent building each injected type, per route. Readable from
+    ``app.ctx.ext.injection_metrics`` when ``INJECTION_METRICS`` is on.
+    """
+
+    __slots__ = ("_histograms",)
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Dict[Type, Histogram]] = {}
+
+    def observe(self, route_name: str, _type: Type, value: float) -> None:
+        try:
+            histogram = self._histograms[route_name][_type]
+        except KeyError:
+            histogram = self._histograms.setdefault(route_name, {}).setdefault(
+                _type, Histogram()
+            )
+        histogram.observe(value)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            route_name: {
+                _type.__name__: {
+                    "buckets": dict(histogram.cumulative()),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                }
+                for _type, histogram in histograms.items()
+            }
+            for route_name, histograms in self._histograms.items()
+        }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent constructing injected arguments",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for route_name, histograms in self._histograms.items():
+            for _type, histogram in histograms.items():
+                labels = f'route="{route_name}",type="{_type.__name__}"'
+                for bound, total in histogram.cumulative():
+                    lines.append(
+                        f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {total}'
+                    )
+                lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.sum}")
+                lines.append(
+                    f"{METRIC_NAME}_count{{{labels}}} {histogram.count}"
+                )
+        return "\n".join(lines) + "\n"
@@ -1,27 +1,325 @@
-from inspect import isawaitable
+from enum import Enum
+from inspect import iscoroutinefunction
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_type_hints,
+)
 
-from sanic import Sanic
+from ...exceptions import InitError
 
 
-def app_injection(app: Sanic, injection_registry: InjectionRegistry):
-    signature_registry = _setup_signature_registry(app, injection_registry)
+class InjectionScope(str, Enum):
+    """
+    How long an injected instance lives.
 
-    @app.signal("http.routing.after")
-    async def inject_kwargs(request, route, kwargs, **_):
-        nonlocal signature_registry
+    - ``APP``: built once without a request in the main process before the
+      workers start (or on first use under ASGI) and copied into every
+      worker by fork. It is torn down once when the main process stops.
+      Anything bound to an event loop, such as HTTP client pools or
+      database connections, must use ``WORKER`` instead
+    - ``WORKER``: built on first use in each worker, cached on ``app.ctx``
+    - ``REQUEST``: built once per request, cached on ``request.ctx``
+    - ``TRANSIENT``: built for every injection
 
-        injections = signature_registry[route.name]
-        injected_args = {
-            name: await _do_cast(_type, constructor, request, **kwargs)
-            for name, (_type, constructor) in injections.items()
-        }
-        request.match_info.update(injected_args)
+    A constructor may only depend on types whose scope lives at least as
+    long as its own.
+    """
 
+    APP = "app"
+    WORKER = "worker"
+    REQUEST = "request"
+    TRANSIENT = "transient"
 
-async def _do_cast(_type, constructor, request, **kwargs):
-    cast = constructor if constructor else _type
-    args = [request] if constructor else []
-    retval = cast(*args, **kwargs)
-    if isawaitable(retval):
-        retval = await retval
-    return retval
+
+_LIFETIMES = {
+    InjectionScope.TRANSIENT: 0,
+    InjectionScope.REQUEST: 1,
+    InjectionScope.WORKER: 2,
+    InjectionScope.APP: 3,
+}
+
+Dependencies = Tuple[Tuple[str, Type], ...]
+Injection = Tuple[
+    Type, Optional[Callable[..., Any]], InjectionScope, Dependencies
+]
+
+
+class InjectionStats:
+    __slots__ = (
+        "constructed",
+        "plans_built",
+        "reused",
+        "signature_setup_time",
+    )
+
+    def __init__(self) -> None:
+        self.constructed = 0
+        self.plans_built = 0
+        self.reused = 0
+        self.signature_setup_time = 0.0
+
+
+class InjectionRegistry:
+    def __init__(self):
+        self._registry: Dict[Type, Optional[Callable[..., Any]]] = {}
+        self._scopes: Dict[Type, InjectionScope] = {}
+        self._teardowns: Dict[Type, Callable[[Any], Any]] = {}
+        self._dependencies: Dict[Type, Dependencies] = {}
+        self._depths: Dict[Type, int] = {}
+        self.stats = InjectionStats()
+
+    def __getitem__(self, key):
+        return self._registry[key]
+
+    def __str__(self) -> str:
+        return str(self._registry)
+
+    def __contains__(self, other: Any):
+        return other in self._registry
+
+    def get(self, key, default=None):
+        return self._registry.get(key, default)
+
+    def scope(self, key) -> InjectionScope:
+        return self._scopes.get(key, InjectionScope.TRANSIENT)
+
+    def teardown(self, key) -> Optional[Callable[[Any], Any]]:
+        return self._teardowns.get(key)
+
+    def scoped(self, scope: InjectionScope) -> Tuple[Type, ...]:
+        return tuple(
+            sorted(
+                (
+                    _type for _type, _scope in self._scopes.items()
+                    if _scope is scope
+                ),
+                key=lambda _type: self._depths.get(_type, 0),
+            )
+        )
+
+    def dependencies(self, key) -> Dependencies:
+        return self._dependencies.get(key, ())
+
+    def injection(self, key) -> Injection:
+        return (
+            key, self._registry[key], self.scope(key), self.dependencies(key)
+        )
+
+    def register(
+        self,
+        _type: Type,
+        constructor: Optional[Callable[..., Any]],
+        scope: Union[InjectionScope, str] = InjectionScope.TRANSIENT,
+        teardown: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self._registry[_type] = constructor
+        self._scopes[_type] = InjectionScope(scope)
+        if teardown:
+            self._teardowns[_type] = teardown
+
+    def finalize(self) -> None:
+        """
+        Inspect every constructor once and build the dependency graph of
+        the registered types. Constructors depend on the registered types
+        they annotate their parameters with.
+        """
+        self._dependencies = {}
+        for _type, constructor in self._registry.items():
+            try:
+                hints = get_type_hints(constructor) if constructor else {}
+            except TypeError:
+                hints = {}
+            self._dependencies[_type] = tuple(
+                (param, annotation)
+                for param, annotation in hints.items()
+                if param != "return" and annotation in self._registry
+            )
+
+        self._depths = {}
+        for _type in self._registry:
+            self._resolve_depth(_type, [])
+
+        for _type, dependencies in self._dependencies.items():
+            scope = self.scope(_type)
+            for _, dependency in dependencies:
+                dependency_scope = self.scope(dependency)
+                if _LIFETIMES[dependency_scope] < _LIFETIMES[scope]:
+                    raise InitError(
+                        f"{_type.__name__} is injected with the {scope.value} "
+                        f"scope and cannot depend on {dependency.__name__}, "
+                        f"which has the shorter-lived "
+                        f"{dependency_scope.value} scope"
+                    )
+
+    def resolve(self, types: List[Type]) -> Tuple[Tuple[Injection, ...], ...]:
+        """
+        All the injections needed to build ``types``, grouped into levels
+        where every injection only depends on earlier levels. Within a
+        level, injections keep the order in which ``types`` (and then
+        their dependencies) were declared.
+        """
+        needed: Dict[Type, int] = {}
+        pending = list(types)
+        for _type in pending:
+            if _type in needed:
+                continue
+            needed[_type] = self._depths[_type]
+            pending.extend(dep for _, dep in self.dependencies(_type))
+
+        levels: List[List[Injection]] = [
+            [] for _ in range(max(needed.values(), default=-1) + 1)
+        ]
+        for _type, depth in needed.items():
+            levels[depth].append(self.injection(_type))
+        return tuple(tuple(level) for level in levels)
+
+    def _resolve_depth(self, _type: Type, path: List[Type]) -> int:
+        if _type in self._depths:
+            return self._depths[_type]
+        if _type in path:
+            cycle = path[path.index(_type):] + [_type]
+            raise InitError(
+                "Circular injection dependency: "
+                + " -> ".join(item.__name__ for item in cycle)
+            )
+
+        path.append(_type)
+        depth = 1 + max(
+            (
+                self._resolve_depth(dependency, path)
+                for _, dependency in self.dependencies(_type)
+            ),
+            default=-1,
+        )
+        path.pop()
+        self._depths[_type] = depth
+        return depth
+
+
+class InjectionPlan:
+    """
+    How to build the injected arguments of one handler.
+
+    ``levels`` come from ``InjectionRegistry.resolve``. Within a level,
+    injections that are awaited (coroutine constructors and cached scopes)
+    run together and everything else runs inline. A ``sequential`` plan
+    keeps each level whole and builds its injections inline, one after
+    another in the order of the level.
+    """
+
+    __slots__ = ("levels", "params", "sequential")
+
+    def __init__(
+        self,
+        params: Tuple[Tuple[str, Type], ...],
+        levels: Tuple[Tuple[Injection, ...], ...],
+        sequential: bool = False,
+    ) -> None:
+        self.params = params
+        self.sequential = sequential
+        if sequential:
+            self.levels = tuple((tuple(level), ()) for level in levels)
+            return
+        self.levels = tuple(
+            (
+                tuple(
+                    injection for injection in level
+                    if not _is_concurrent(injection)
+                ),
+                tuple(
+                    injection for injection in level
+                    if _is_concurrent(injection)
+                ),
+            )
+            for level in levels
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.params)
+
+    @classmethod
+    def from_handler(
+        cls, handler: Callable[..., Any], injection_registry: InjectionRegistry
+    ) -> Optional["InjectionPlan"]:
+        try:
+            hints = get_type_hints(handler)
+        except TypeError:
+            return None
+        params = tuple(
+            (param, annotation)
+            for param, annotation in hints.items()
+            if annotation in injection_registry
+        )
+        if not params:
+            return None
+        return cls(
+            params,
+            injection_registry.resolve([_type for _, _type in params]),
+            sequential=getattr(handler, "__injection_sequential__", False),
+        )
+
+
+def _is_concurrent(injection: Injection) -> bool:
+    _type, constructor, scope, _ = injection
+    return scope is not InjectionScope.TRANSIENT or iscoroutinefunction(
+        constructor or _type
+    )
+
+
+class SignatureRegistry:
+    """
+    Injection plans by route name. Handlers are only introspected the first
+    time their route is hit, so startup just records which handler belongs
+    to which route.
+    """
+
+    def __init__(self, injection_registry: InjectionRegistry):
+        self._registry: Dict[str, Optional[InjectionPlan]] = {}
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._injection_registry = injection_registry
+
+    def __getitem__(self, key: str) -> Optional[InjectionPlan]:
+        plan = self.get(key, _missing)
+        if plan is _missing:
+            raise KeyError(key)
+        return plan
+
+    def __str__(self) -> str:
+        return str(self._registry)
+
+    def get(self, key: str, default=None) -> Optional[InjectionPlan]:
+        try:
+            return self._registry[key]
+        except KeyError:
+            handler = self._handlers.pop(key, None)
+            if handler is None:
+                return default
+        plan = InjectionPlan.from_handler(handler, self._injection_registry)
+        self._injection_registry.stats.plans_built += 1
+        self._registry[key] = plan
+        return plan
+
+    def add_handler(self, route_name: str, handler: Callable[..., Any]) -> None:
+        self._registry.pop(route_name, None)
+        self._handlers[route_name] = handler
+
+    def register(self, route_name: str, plan: InjectionPlan) -> None:
+        self._registry[route_name] = plan
+
+    def build_all(self) -> None:
+        """
+        Build every pending plan now, so that forked workers inherit them
+        instead of each introspecting the handlers on first hit.
+        """
+        for route_name in list(self._handlers):
+            self.get(route_name)
+
+
+_missing = object()
@@ -0,0 +1,43 @@
+from inspect import isawaitable
+from typing import Any, Callable
+
+from sanic import Sanic
+
+Listener = Callable[[Sanic, Any], Any]
+
+
+def startup_listener(app: Sanic) -> Callable[[Listener], Listener]:
+    """
+    Register a listener that derives state from the routes.
+
+    It normally runs in ``before_server_start``. With ``PREFORK_STARTUP``
+    it runs once in ``main_process_start`` instead, before the workers are
+    forked, and the workers inherit its results. The router is not
+    finalized yet at that point, so listeners should check
+    ``app.router.finalized`` before finalizing it themselves. Servers
+    without a main process (ASGI) still run it in ``before_server_start``.
+    """
+
+    def decorator(listener: Listener) -> Listener:
+        if not app.ctx.ext.snapshot.prefork_startup:
+            app.before_server_start(listener)
+            return listener
+
+        done = False
+
+        async def run_once(app: Sanic, loop: Any) -> None:
+            nonlocal done
+
+            if done:
+                return
+            done = True
+            retval = listener(app, loop)
+            if isawaitable(retval):
+                await retval
+
+        run_once.__name__ = listener.__name__
+        app.main_process_start(run_once)
+        app.before_server_start(run_once)
+        return listener
+
+    return decorator
@@ -1,7 +1,13 @@
 import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Tuple
 
 from sanic import Sanic
 
+PARAMETER_PATTERN = re.compile(r"<([^<>:]+)(?::[^<>]*)?>")
+_CONTAINERS = (dict, list)
+_RECURSION_DEPTH = 128
+
 
 def clean_route_name(name: str) -> str:
     parts = name.split(".", 1)
@@ -15,20 +21,105 @@ def clean_route_name(name: str) -> str:
 def get_uri_filter(app: "Sanic"):
     choice = getattr(app.config, "API_URI_FILTER", None)
     if choice == "slash":
-        return lambda uri: not uri.endwith("/")
+        return lambda uri: not uri.endswith("/")
 
     if choice == "all":
         return lambda uri: False
 
-    return lambda uri: len(uri) > 1 and uri.endwith("/")
+    return lambda uri: len(uri) > 1 and uri.endswith("/")
+
+
+def remove_nulls(dictionary, deep=True, in_place=False):
+    """
+    Drop the keys whose value is ``None``. With ``deep`` the nested dicts
+    are cleaned too, including dicts inside lists. Documents nested deeper
+    than the recursion limit allows are walked with an explicit stack.
+    ``in_place`` mutates the given objects instead of building copies.
+    """
+    if in_place:
+        return _remove_nulls_in_place(dictionary, deep)
+
+    if not deep:
+        return {k: v for k, v in dictionary.items() if v is not None}
+
+    return _copy_dict(dictionary, 0)
 
 
-def remove_nulls(dictionary, deep=True):
-    return {
-        k: remove_nulls(v, deep) if deep and type(v) is dict else v
-        for k, v in dictionary.items()
-        if v is not None
-    }
+def _copy_dict(source, depth):
+    # Recursing is cheaper than the stack, which is kept for deep documents
+    if depth >= _RECURSION_DEPTH:
+        return _copy_with_stack(source)
+    depth += 1
+    target = {}
+    for k, v in source.items():
+        if v is None:
+            continue
+        if isinstance(v, dict):
+            v = _copy_dict(v, depth)
+        elif isinstance(v, list):
+            v = _copy_list(v, depth)
+        target[k] = v
+    return target
+
+
+def _copy_list(source, depth):
+    if depth >= _RECURSION_DEPTH:
+        return _copy_with_stack(source)
+    depth += 1
+    target = []
+    for v in source:
+        if isinstance(v, dict):
+            v = _copy_dict(v, depth)
+        elif isinstance(v, list):
+            v = _copy_list(v, depth)
+        target.append(v)
+    return target
+
+
+def _copy_with_stack(container):
+    root: Any = {} if isinstance(container, dict) else []
+    stack: List[Tuple[Any, Any]] = [(container, root)]
+    push = stack.append
+    while stack:
+        source, target = stack.pop()
+        if isinstance(source, dict):
+            for k, v in source.items():
+                if v is None:
+                    continue
+                if isinstance(v, _CONTAINERS):
+                    child = {} if isinstance(v, dict) else []
+                    push((v, child))
+                    v = child
+                target[k] = v
+        else:
+            for v in source:
+                if isinstance(v, _CONTAINERS):
+                    child = {} if isinstance(v, dict) else []
+                    push((v, child))
+                    v = child
+                target.append(v)
+    return root
+
+
+def _remove_nulls_in_place(dictionary, deep):
+    stack = [dictionary]
+    push = stack.append
+    while stack:
+        source = stack.pop()
+        if isinstance(source, dict):
+            nulls = []
+            for k, v in source.items():
+                if v is None:
+                    nulls.append(k)
+                elif deep and isinstance(v, _CONTAINERS):
+                    push(v)
+            for k in nulls:
+                del source[k]
+        else:
+            for v in source:
+                if isinstance(v, _CONTAINERS):
+                    push(v)
+    return dictionary
 
 
 def remove_nulls_from_kwargs(**kwargs):
@@ -52,35 +143,87 @@ def get_blueprinted_routes(app):
                 yield (blueprint.name, route.handler)
 
 
-def get_all_routes(app, skip_prefix):
-    uri_filter = get_uri_filter(app)
-
-    for group in app.router.groups.values():
+@dataclass(frozen=True)
+class RouteEntry:
+    """
+    One route of a finalized router, listed under one of its URIs with the
+    parameters written the OpenAPI way (``/users/{user_id}``).
+    """
+
+    __slots__ = (
+        "clean_name",
+        "method_handlers",
+        "name",
+        "params",
+        "raw_path",
+        "uri",
+    )
+
+    clean_name: str
+    method_handlers: Tuple[Tuple[str, Callable[..., Any]], ...]
+    name: str
+    params: Tuple[Any, ...]
+    raw_path: str
+    uri: str
+
+
+def get_route_index(app: Sanic) -> Tuple[RouteEntry, ...]:
+    """
+    Every route of the app, built once per router finalization and cached
+    on ``app.ctx``. Resetting the router (``app.router.reset()``) replaces
+    its tree, which invalidates the index.
+    """
+    router = app.router
+    cached = getattr(app.ctx, "_route_index", None)
+    if cached and cached[0] is router.tree:
+        return cached[1]
+
+    index = tuple(_build_route_index(router))
+    if router.finalized:
+        app.ctx._route_index = (router.tree, index)
+    return index
+
+
+def _build_route_index(router) -> Iterator[RouteEntry]:
+    for group in router.groups.values():
         uri = f"/{group.path}"
         uris = [uri]
         if not group.strict and len(uri) > 1:
-            alt = uri[:1] if uri.endswith("/") else f"{uri}/"
+            alt = uri[:-1] if uri.endswith("/") else f"{uri}/"
             uris.append(alt)
 
-        for uri in uris:
-            if uri_filter(uri):
-                continue
-            if group.raw_path.startswith(skip_prefix.lstrip("/")):
+        routes: List[Tuple[str, str, Tuple[Any, ...], Tuple[Any, ...]]] = []
+        for route in group:
+            if route.name and "static" in route.name:
                 continue
+            routes.append(
+                (
+                    route.name.split(".", 1)[-1],
+                    clean_route_name(route.name),
+                    # Routes only get their sorted params when finalized
+                    tuple(getattr(route, "params", route._params).values()),
+                    tuple((method, route.handler) for method in route.methods),
+                )
+            )
 
-            for parameter in group.params.values():
-                uri = re.sub(
-                    f"<{parameter.name}.*?>",
-                    f"{{{parameter.name}}}",
-                    uri
+        for uri in uris:
+            uri = PARAMETER_PATTERN.sub(r"{\1}", uri)
+            for name, clean_name, params, method_handlers in routes:
+                yield RouteEntry(
+                    clean_name=clean_name,
+                    method_handlers=method_handlers,
+                    name=name,
+                    params=params,
+                    raw_path=group.raw_path,
+                    uri=uri,
                 )
-            for route in group:
-                if route.name and "static" in route.name:
-                    continue
 
-                method_handlers = [
-                    (method, route.handler) for method in route.methods
-                ]
 
-                _, name = route.name.split(".", 1)
-                yield (uri, name, route.params.values(), method_handlers)
+def get_all_routes(app, skip_prefix):
+    uri_filter = get_uri_filter(app)
+    skip_prefix = skip_prefix.lstrip("/")
+
+    for entry in get_route_index(app):
+        if uri_filter(entry.uri) or entry.raw_path.startswith(skip_prefix):
+            continue
+        yield (entry.uri, entry.name, entry.params, list(entry.method_handlers))
@@ -0,0 +1,122 @@
+import gzip
+from hashlib import sha1
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sanic import Sanic
+from sanic.request import Request
+from sanic.response import HTTPResponse, json_dumps
+
+from .route import RouteEntry, get_all_routes, get_route_index
+
+Route = Tuple[str, str, Any, List[Tuple[str, Callable[..., Any]]]]
+DocumentBuilder = Callable[[], Dict[str, Any]]
+PathBuilder = Callable[[str, List[Route]], Dict[str, Any]]
+
+
+class SpecCache:
+    """
+    A JSON document whose ``paths`` member describes the routes of an app,
+    such as an OpenAPI spec, kept as serialized bytes.
+
+    ``build_document`` returns every member except ``paths``.
+    ``build_path`` returns the path item for one URI from its
+    ``get_all_routes`` entries. The first read after the router is
+    finalized rebuilds the document, but only path items whose routes
+    changed are serialized again. ``response`` serves the cached bytes
+    with an ETag, gzipped for clients that accept it.
+    """
+
+    __slots__ = (
+        "_body",
+        "_build_document",
+        "_build_path",
+        "_etag",
+        "_fragments",
+        "_gzipped",
+        "_index",
+        "skip_prefix",
+    )
+
+    def __init__(
+        self,
+        build_document: DocumentBuilder,
+        build_path: PathBuilder,
+        skip_prefix: str,
+    ) -> None:
+        self._build_document = build_document
+        self._build_path = build_path
+        self.skip_prefix = skip_prefix
+        self._fragments: Dict[str, Tuple[Tuple[Any, ...], bytes]] = {}
+        self._index: Optional[Tuple[RouteEntry, ...]] = None
+        self._body = b""
+        self._gzipped = b""
+        self._etag = ""
+
+    def invalidate(self) -> None:
+        """
+        Forget every serialized path item, for when the builders would
+        return something different for the same routes.
+        """
+        self._fragments = {}
+        self._index = None
+
+    def get(self, app: Sanic) -> Tuple[bytes, bytes, str]:
+        """
+        The serialized document, its gzipped variant and its ETag.
+        """
+        index = get_route_index(app)
+        if index is not self._index:
+            self._build(app)
+            self._index = index if app.router.finalized else None
+        return self._body, self._gzipped, self._etag
+
+    def response(self, request: Request) -> HTTPResponse:
+        body, gzipped, etag = self.get(request.app)
+        headers = {"vary": "accept-encoding"}
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            body = gzipped
+            etag = f'{etag[:-1]}-gzip"'
+            headers["content-encoding"] = "gzip"
+        headers["etag"] = etag
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip() for tag in if_none_match.split(","))
+        ):
+            return HTTPResponse(status=304, headers=headers)
+        return HTTPResponse(
+            body, headers=headers, content_type="application/json"
+        )
+
+    def _build(self, app: Sanic) -> None:
+        routes: Dict[str, List[Route]] = {}
+        for route in get_all_routes(app, self.skip_prefix):
+            routes.setdefault(route[0], []).append(route)
+
+        fragments = {}
+        for uri, uri_routes in routes.items():
+            key = tuple(
+                (name, tuple(method_handlers))
+                for _, name, _, method_handlers in uri_routes
+            )
+            fragment = self._fragments.get(uri)
+            if fragment is None or fragment[0] != key:
+                fragment = (
+                    key,
+                    json_dumps(self._build_path(uri, uri_routes)).encode(),
+                )
+            fragments[uri] = fragment
+        self._fragments = fragments
+
+        paths = b",".join(
+            json_dumps(uri).encode() + b":" + fragment
+            for uri, (_, fragment) in fragments.items()
+        )
+        document = json_dumps(self._build_document()).encode()
+        separator = b"," if document != b"{}" else b""
+        self._body = (
+            document[:-1] + separator + b'"paths":{' + paths + b"}}"
+        )
+        self._gzipped = gzip.compress(self._body, mtime=0)
+        self._etag = f'"{sha1(self._body).hexdigest()}"'
@@ -0,0 +1,20 @@
+import re
+
+import pytest
+from sanic import Sanic
+
+from sanic_ext.extensions.base import Extension
+
+
+@pytest.fixture(autouse=True)
+def reset_extensions():
+    Sanic.test_mode = True
+    yield
+    for extension in Extension._name_register.values():
+        if not isinstance(extension, str):
+            extension._singleton = None
+
+
+@pytest.fixture
+def app(request):
+    return Sanic(re.sub(r"[^a-zA-Z0-9_]", "_", request.node.name))
@@ -0,0 +1,63 @@
+import pytest
+from sanic.response import text
+
+from sanic_ext.bootstrap import Extend
+
+PREFLIGHT_HEADERS = {
+    "origin": "https://app.example.com",
+    "access-control-request-method": "POST",
+    "access-control-request-headers": "X-Request-Id, content-type, x-other",
+}
+
+
+def _preflight(app, fast_preflight, origin="https://app.example.com"):
+    Extend(
+        app,
+        config={
+            "oas": False,
+            "cors_origins": "https://app.example.com,https://*.example.org",
+            "cors_allow_headers": "content-type, x-request-id",
+            "cors_max_age": 600,
+            "cors_fast_preflight": fast_preflight,
+        },
+    )
+
+    @app.route("/items", methods=["GET", "POST"])
+    async def items(request):
+        return text("")
+
+    _, response = app.test_client.options(
+        "/items", headers={**PREFLIGHT_HEADERS, "origin": origin}
+    )
+    return response
+
+
+def _cors_headers(response):
+    return {
+        key: value
+        for key, value in response.headers.items()
+        if key.startswith("access-control-") or key in ("allow", "vary")
+    }
+
+
+@pytest.mark.parametrize("fast_preflight", (False, True))
+def test_preflight(app, fast_preflight):
+    response = _preflight(app, fast_preflight)
+
+    assert response.status == 204
+    assert _cors_headers(response) == {
+        "access-control-allow-headers": "x-request-id,content-type",
+        "access-control-allow-methods": "GET,HEAD,OPTIONS,POST",
+        "access-control-allow-origin": "https://app.example.com",
+        "access-control-max-age": "600",
+        "allow": "GET,HEAD,POST,OPTIONS",
+        "vary": "origin",
+    }
+
+
+@pytest.mark.parametrize("fast_preflight", (False, True))
+def test_preflight_from_unknown_origin(app, fast_preflight):
+    response = _preflight(app, fast_preflight, origin="https://evil.com")
+
+    assert response.status == 204
+    assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+from sanic.response import text
+
+from sanic_ext.bootstrap import Extend
+
+
+def test_trace_drops_excluded_headers(app):
+    Extend(app, config={"oas": False, "http_auto_trace": True})
+    echoed = {}
+
+    @app.get("/items")
+    async def items(request):
+        return text("items")
+
+    @app.after_server_start
+    async def send_trace(app, _):
+        reader, writer = await asyncio.open_connection(
+            app.test_client.host, app.test_client.port
+        )
+        writer.write(
+            b"TRACE /items HTTP/1.1\r\n"
+            b"host: localhost\r\n"
+            b"Authorization:Bearer secret\r\n"
+            b"cookie : session=secret\r\n"
+            b"x-request-id: abc\r\n"
+            b"connection: close\r\n\r\n"
+        )
+        echoed["response"] = await reader.read()
+        writer.close()
+
+    app.test_client.get("/items")
+
+    head, _, body = echoed["response"].partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"content-type: message/http" in head
+    assert body.startswith(b"TRACE /items HTTP/1.1\r\n")
+    assert b"x-request-id: abc" in body
+    assert b"secret" not in body
+
+
+def _automatic_routes_log(caplog):
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if "automatic routes" in record.getMessage()
+    ]
+
+
+def test_log_counts_features_that_added_routes(app, caplog):
+    Extend(app, config={"oas": False, "http_auto_trace": True})
+
+    @app.route("/items", methods=["GET", "OPTIONS"])
+    async def items(request):
+        return text("items")
+
+    with caplog.at_level(logging.INFO):
+        app.test_client.get("/items")
+
+    (message,) = _automatic_routes_log(caplog)
+    assert "added 2 automatic routes" in message
+    assert "1 router finalize instead of 2" in message
+
+
+def test_log_without_finalize_claims_no_saving(app, caplog):
+    Extend(app, config={"oas": False, "prefork_startup": True})
+
+    @app.get("/items")
+    async def items(request):
+        return text("items")
+
+    with caplog.at_level(logging.INFO):
+        _, response = app.test_client.head("/items")
+
+    assert response.status == 200
+    (message,) = _automatic_routes_log(caplog)
+    assert "added 2 automatic routes" in message
+    assert "saved" not in message
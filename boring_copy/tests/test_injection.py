@@ -0,0 +1,247 @@
+import asyncio
+
+import pytest
+from sanic.response import text
+
+from sanic_ext.bootstrap import Extend
+from sanic_ext.extensions.injection.injector import sequential_injection
+
+
+class A:
+    pass
+
+
+class B:
+    pass
+
+
+class C:
+    pass
+
+
+@pytest.fixture
+def built():
+    return []
+
+
+@pytest.fixture
+def ext(app, built):
+    ext = Extend(app, config={"oas": False})
+
+    async def make_a(request):
+        await asyncio.sleep(0)
+        built.append("A")
+        return A()
+
+    def make_b(request):
+        built.append("B")
+        return B()
+
+    async def make_c(request):
+        await asyncio.sleep(0)
+        built.append("C")
+        return C()
+
+    ext.injection(A, make_a)
+    ext.injection(B, make_b)
+    ext.injection(C, make_c)
+    return ext
+
+
+def test_sequential_handlers_build_in_declaration_order(app, ext, built):
+    @app.get("/")
+    @sequential_injection
+    async def handler(request, a: A, b: B, c: C):
+        return text("")
+
+    _, response = app.test_client.get("/")
+
+    assert response.status == 200
+    assert built == ["A", "B", "C"]
+
+
+def test_sync_constructors_run_before_awaited_ones(app, ext, built):
+    @app.get("/")
+    async def handler(request, a: A, b: B, c: C):
+        return text("")
+
+    _, response = app.test_client.get("/")
+
+    assert response.status == 200
+    assert built == ["B", "A", "C"]
+
+
+def test_awaited_constructors_run_together(app):
+    ext = Extend(app, config={"oas": False})
+    started = asyncio.Event()
+    other_started = asyncio.Event()
+
+    async def make_a(request):
+        started.set()
+        await asyncio.wait_for(other_started.wait(), 1)
+        return A()
+
+    async def make_c(request):
+        other_started.set()
+        await asyncio.wait_for(started.wait(), 1)
+        return C()
+
+    ext.injection(A, make_a)
+    ext.injection(C, make_c)
+
+    @app.get("/")
+    async def handler(request, a: A, c: C):
+        return text(f"{type(a).__name__}{type(c).__name__}")
+
+    _, response = app.test_client.get("/")
+
+    assert response.text == "AC"
+
+
+def test_automatic_head_injects_the_get_arguments(app):
+    ext = Extend(app, config={"oas": False})
+    ext.injection(B, lambda request: B())
+
+    @app.get("/")
+    async def handler(request, b: B):
+        return text(type(b).__name__)
+
+    _, response = app.test_client.head("/")
+
+    assert response.status == 200
+    assert response.headers["content-length"] == "1"
+
+
+def test_scoped_instances_are_cached_and_torn_down(app):
+    ext = Extend(app, config={"oas": False})
+    built = []
+    torn_down = []
+
+    class PerWorker:
+        pass
+
+    class PerRequest:
+        pass
+
+    class Transient:
+        pass
+
+    def make(kind):
+        def constructor(request, **_):
+            built.append(kind.__name__)
+            return kind()
+
+        return constructor
+
+    def make_transient(request, shared: PerRequest):
+        built.append("Transient")
+        return Transient()
+
+    ext.injection(
+        PerWorker, make(PerWorker), scope="worker", teardown=torn_down.append
+    )
+    ext.injection(
+        PerRequest,
+        make(PerRequest),
+        scope="request",
+        teardown=torn_down.append,
+    )
+    ext.injection(Transient, make_transient)
+
+    @app.get("/")
+    async def handler(
+        request, worker: PerWorker, shared: PerRequest, transient: Transient
+    ):
+        return text("")
+
+    @app.get("/again")
+    async def again(request, worker: PerWorker, shared: PerRequest):
+        return text("")
+
+    @app.after_server_start
+    async def send_requests(app, _):
+        reader, writer = await asyncio.open_connection(
+            app.test_client.host, app.test_client.port
+        )
+        for path in (b"/", b"/again"):
+            writer.write(b"GET %s HTTP/1.1\r\nhost: localhost\r\n\r\n" % path)
+            await reader.readuntil(b"\r\n\r\n")
+        writer.close()
+
+    app.test_client.get("/")
+
+    assert built.count("PerWorker") == 1
+    assert built.count("PerRequest") == 3
+    assert built.count("Transient") == 2
+    assert [type(item).__name__ for item in torn_down] == [
+        "PerRequest",
+        "PerRequest",
+        "PerRequest",
+        "PerWorker",
+    ]
+
+
+def test_app_scope_is_built_once_without_a_request(app):
+    ext = Extend(app, config={"oas": False})
+    built = []
+    torn_down = []
+
+    class Shared:
+        pass
+
+    def make_shared():
+        built.append("Shared")
+        return Shared()
+
+    ext.injection(
+        Shared, make_shared, scope="app", teardown=torn_down.append
+    )
+
+    @app.get("/")
+    async def handler(request, shared: Shared):
+        return text(type(shared).__name__)
+
+    @app.after_server_start
+    async def send_request(app, _):
+        reader, writer = await asyncio.open_connection(
+            app.test_client.host, app.test_client.port
+        )
+        writer.write(b"GET / HTTP/1.1\r\nhost: localhost\r\n\r\n")
+        await reader.readuntil(b"\r\n\r\n")
+        writer.close()
+
+    _, response = app.test_client.get("/")
+
+    assert response.text == "Shared"
+    assert built == ["Shared"]
+    assert [type(item).__name__ for item in torn_down] == ["Shared"]
+
+
+def test_middleware_shares_request_instances(app):
+    ext = Extend(app, config={"oas": False})
+    built = []
+
+    class Session:
+        def __init__(self, user_id):
+            self.user_id = user_id
+
+    def make_session(request, user_id):
+        built.append(user_id)
+        return Session(user_id)
+
+    ext.injection(Session, make_session, scope="request")
+
+    @app.on_request
+    async def load_session(request):
+        session = await request.app.ctx.ext.get_injected(request, Session)
+        request.ctx.session = session
+
+    @app.get("/users/<user_id:int>")
+    async def handler(request, user_id: int, session: Session):
+        assert session is request.ctx.session
+        return text(str(session.user_id))
+
+    _, response = app.test_client.get("/users/7")
+
+    assert response.text == "7"
+    assert built == [7]
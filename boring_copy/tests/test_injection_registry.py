@@ -0,0 +1,107 @@
+import pytest
+
+from sanic_ext.exceptions import InitError
+from sanic_ext.extensions.injection.registry import (
+    InjectionRegistry,
+    InjectionScope,
+)
+
+
+class A:
+    pass
+
+
+class B:
+    pass
+
+
+class C:
+    pass
+
+
+class D:
+    pass
+
+
+def _names(levels):
+    return [[injection[0].__name__ for injection in level] for level in levels]
+
+
+def test_resolve_keeps_declaration_order():
+    registry = InjectionRegistry()
+    for _type in (A, B, C):
+        registry.register(_type, None)
+    registry.finalize()
+
+    assert _names(registry.resolve([A, B, C])) == [["A", "B", "C"]]
+    assert _names(registry.resolve([C, A, B])) == [["C", "A", "B"]]
+
+
+def test_resolve_levels_follow_dependencies():
+    def make_c(a: A, b: B) -> C:
+        return C()
+
+    def make_d(c: C) -> D:
+        return D()
+
+    registry = InjectionRegistry()
+    registry.register(A, None)
+    registry.register(B, None)
+    registry.register(C, make_c)
+    registry.register(D, make_d)
+    registry.finalize()
+
+    assert _names(registry.resolve([D])) == [["A", "B"], ["C"], ["D"]]
+    assert _names(registry.resolve([B, D])) == [["B", "A"], ["C"], ["D"]]
+
+
+def test_cycles_are_rejected():
+    def make_a(c: C) -> A:
+        return A()
+
+    def make_b(a: A) -> B:
+        return B()
+
+    def make_c(b: B) -> C:
+        return C()
+
+    registry = InjectionRegistry()
+    registry.register(A, make_a)
+    registry.register(B, make_b)
+    registry.register(C, make_c)
+
+    with pytest.raises(InitError, match="A -> C -> B -> A"):
+        registry.finalize()
+
+
+@pytest.mark.parametrize(
+    "scope,dependency_scope",
+    (
+        (InjectionScope.APP, InjectionScope.WORKER),
+        (InjectionScope.APP, InjectionScope.TRANSIENT),
+        (InjectionScope.WORKER, InjectionScope.REQUEST),
+        (InjectionScope.REQUEST, InjectionScope.TRANSIENT),
+    ),
+)
+def test_shorter_lived_dependencies_are_rejected(scope, dependency_scope):
+    def make_b(a: A) -> B:
+        return B()
+
+    registry = InjectionRegistry()
+    registry.register(A, None, dependency_scope)
+    registry.register(B, make_b, scope)
+
+    with pytest.raises(InitError, match="cannot depend on A"):
+        registry.finalize()
+
+
+def test_longer_lived_dependencies_are_allowed():
+    def make_b(a: A) -> B:
+        return B()
+
+    registry = InjectionRegistry()
+    registry.register(A, None, InjectionScope.APP)
+    registry.register(B, make_b, InjectionScope.TRANSIENT)
+    registry.finalize()
+
+    assert registry.dependencies(B) == (("a", A),)
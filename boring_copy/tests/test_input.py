@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+from markupsafe import Markup
+
+from wtforms.widgets.core import Input, TextInput, html_params
+
+
+class Field:
+    """
+    The parts of a field that input widgets read.
+    """
+
+    def __init__(self, data="", name="field", **flags):
+        self.id = self.name = name
+        self.data = data
+        self.flags = SimpleNamespace(**flags)
+
+    def _value(self):
+        return self.data
+
+
+def _expected(field, input_type="text", **kwargs):
+    return "<input %s>" % html_params(
+        id=field.id,
+        name=field.name,
+        type=input_type,
+        value=field.data,
+        **kwargs
+    )
+
+
+def test_template_matches_html_params():
+    widget = TextInput()
+    field = Field("a & b", required=True)
+
+    first = widget(field, placeholder="Name")
+    second = widget(Field('"quoted"', name="other"), placeholder="Name")
+
+    assert first == _expected(field, required=True, placeholder="Name")
+    assert second == (
+        '<input id="other" name="other" placeholder="Name" type="text" '
+        'value="&#34;quoted&#34;">'
+    )
+    assert len(widget._templates) == 2
+
+
+def test_template_is_reused_for_the_same_attributes():
+    widget = TextInput()
+
+    widget(Field("a"), placeholder="Name")
+    widget(Field("b", name="other"), placeholder="Name")
+
+    assert len(widget._templates) == 1
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    (
+        (Markup("<i>x</i>"), "<i>x</i>"),
+        ("<i>x</i>", Markup("<i>x</i>")),
+        (False, 0),
+        (0, False),
+        (1.0, 1),
+        (True, 1),
+    ),
+)
+def test_equal_values_of_other_types_get_their_own_template(first, second):
+    widget = Input("text")
+    field = Field("value")
+
+    widget(field, placeholder=first)
+    html = widget(field, placeholder=second)
+
+    assert html == _expected(field, placeholder=second)
+
+
+def test_values_without_a_template():
+    widget = Input("checkbox")
+    field = Field(None)
+
+    assert widget(field) == '<input id="field" name="field" type="checkbox">'
+    assert widget(field, id=None) == '<input name="field" type="checkbox">'
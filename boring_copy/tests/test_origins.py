@@ -0,0 +1,69 @@
+import re
+
+from sanic_ext.extensions.http.origins import WILDCARD_PATTERN, OriginMatcher
+
+
+def _matcher(*patterns, cache_size=16):
+    return OriginMatcher(
+        tuple(re.compile(pattern) for pattern in patterns), cache_size
+    )
+
+
+def test_literal_origins():
+    matcher = _matcher("https://example.com", r"https://api\.example\.com")
+
+    assert matcher._literals == {
+        "https://example.com",
+        "https://api.example.com",
+    }
+    assert not matcher._patterns
+    assert matcher.match("https://example.com")
+    assert matcher.match("HTTPS://API.Example.com")
+    assert not matcher.match("http://example.com")
+    assert not matcher.match("https://example.com.evil.org")
+
+
+def test_subdomain_trie():
+    matcher = _matcher(r"https://*\.example\.com")
+
+    assert not matcher._literals
+    assert not matcher._patterns
+    assert matcher.match("https://a.example.com")
+    assert matcher.match("https://a.b.example.com")
+    assert not matcher.match("https://example.com")
+    assert not matcher.match("http://a.example.com")
+    assert not matcher.match("https://a.example.org")
+    assert not matcher.match("https://aexample.com")
+
+
+def test_regex_origins_are_merged():
+    matcher = _matcher(
+        r"https://tenant[0-9]+\.example\.com",
+        r"https://[a-z]+\.example\.org",
+        "https://exact.example.net",
+    )
+
+    assert len(matcher._patterns) == 1
+    assert matcher.match("https://tenant42.example.com")
+    assert matcher.match("https://abc.example.org")
+    assert matcher.match("https://exact.example.net")
+    assert not matcher.match("https://tenant.example.com")
+
+
+def test_wildcard():
+    matcher = OriginMatcher((WILDCARD_PATTERN,), 16)
+
+    assert matcher.match("https://anything.example.com")
+    assert matcher.stats.origin_cache_misses == 0
+
+
+def test_cache_counters():
+    matcher = _matcher("https://example.com", cache_size=1)
+
+    assert matcher.match("https://example.com")
+    assert matcher.match("https://example.com")
+    assert not matcher.match("https://other.com")
+    assert matcher.match("https://example.com")
+
+    assert matcher.stats.origin_cache_hits == 1
+    assert matcher.stats.origin_cache_misses == 3
@@ -0,0 +1,166 @@
+import sys
+from collections import OrderedDict
+
+import pytest
+
+from sanic.response import text
+
+from sanic_ext.utils.route import (
+    get_all_routes,
+    get_route_index,
+    remove_nulls,
+    remove_nulls_from_kwargs,
+)
+
+
+def _deep_document(depth):
+    root = node = {}
+    for i in range(depth):
+        node["description"] = None
+        node["level"] = i
+        node["child"] = {}
+        node = node["child"]
+    return root
+
+
+def _depth(document):
+    depth = 0
+    while "child" in document:
+        assert "description" not in document
+        document = document["child"]
+        depth += 1
+    return depth
+
+
+def test_remove_nulls():
+    document = {"a": None, "b": 1, "c": {"d": None, "e": []}}
+
+    assert remove_nulls(document) == {"b": 1, "c": {"e": []}}
+    assert document == {"a": None, "b": 1, "c": {"d": None, "e": []}}
+
+
+def test_remove_nulls_in_lists_of_dicts():
+    document = {
+        "parameters": [
+            {"name": "id", "schema": None},
+            [{"nested": None, "kept": 0}],
+            None,
+        ]
+    }
+
+    assert remove_nulls(document) == {
+        "parameters": [{"name": "id"}, [{"kept": 0}], None]
+    }
+
+
+def test_remove_nulls_copies_dict_subclasses():
+    document = {"ordered": OrderedDict(a=None, b=False)}
+
+    cleaned = remove_nulls(document)
+
+    assert cleaned == {"ordered": {"b": False}}
+    assert document["ordered"] == OrderedDict(a=None, b=False)
+
+
+def test_remove_nulls_shallow():
+    document = {"a": None, "b": {"c": None}}
+
+    assert remove_nulls(document, deep=False) == {"b": {"c": None}}
+    assert remove_nulls_from_kwargs(a=None, b=0) == {"b": 0}
+
+
+def test_remove_nulls_in_place():
+    nested = {"c": None, "d": [{"e": None}]}
+    document = {"a": None, "b": nested}
+
+    cleaned = remove_nulls(document, in_place=True)
+
+    assert cleaned is document
+    assert document == {"b": {"d": [{}]}}
+    assert document["b"] is nested
+
+
+def test_remove_nulls_in_place_shallow():
+    document = {"a": None, "b": {"c": None}}
+
+    remove_nulls(document, deep=False, in_place=True)
+
+    assert document == {"b": {"c": None}}
+
+
+def test_remove_nulls_deeper_than_the_recursion_limit():
+    depth = sys.getrecursionlimit() + 100
+    document = _deep_document(depth)
+
+    assert _depth(remove_nulls(document)) == depth
+    assert _depth(remove_nulls(document, in_place=True)) == depth
+
+
+async def handler(request, **_):
+    return text("")
+
+
+def _uris(index):
+    return [entry.uri for entry in index]
+
+
+def test_route_index_is_cached_per_router_tree(app):
+    app.add_route(handler, "/items", strict_slashes=True)
+    app.router.finalize()
+
+    index = get_route_index(app)
+
+    assert get_route_index(app) is index
+    assert _uris(index) == ["/items"]
+
+    app.router.reset()
+    app.add_route(handler, "/users", name="users", strict_slashes=True)
+    app.router.finalize()
+
+    assert _uris(get_route_index(app)) == ["/items", "/users"]
+
+
+def test_route_index_is_not_cached_before_finalize(app):
+    app.add_route(handler, "/items/<item_id:int>", strict_slashes=True)
+
+    assert _uris(get_route_index(app)) == ["/items/{item_id}"]
+    assert not hasattr(app.ctx, "_route_index")
+
+
+@pytest.mark.parametrize(
+    "uri,expected",
+    (("/items", ["/items", "/items/"]), ("/items/", ["/items", "/items/"])),
+)
+def test_non_strict_routes_list_the_alternate_uri(app, uri, expected):
+    app.add_route(handler, uri, strict_slashes=False)
+    app.router.finalize()
+
+    assert _uris(get_route_index(app)) == expected
+
+
+def test_parameters_are_written_the_openapi_way(app):
+    app.add_route(
+        handler,
+        "/users/<user_id:int>/posts/<slug>",
+        name="user_post",
+        strict_slashes=True,
+    )
+    app.router.finalize()
+
+    (entry,) = get_route_index(app)
+
+    assert entry.uri == "/users/{user_id}/posts/{slug}"
+    assert entry.raw_path == "users/<user_id:int>/posts/<slug>"
+    assert {param.name for param in entry.params} == {"user_id", "slug"}
+    assert entry.name == "user_post"
+    assert entry.method_handlers == (("GET", handler),)
+
+
+def test_get_all_routes_filters_the_index(app):
+    app.add_route(handler, "/items", strict_slashes=False)
+    app.add_route(handler, "/docs/spec", name="spec", strict_slashes=True)
+    app.router.finalize()
+
+    routes = list(get_all_routes(app, "/docs"))
+
+    assert routes == [("/items", "handler", (), [("GET", handler)])]
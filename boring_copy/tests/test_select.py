@@ -0,0 +1,157 @@
+from markupsafe import Markup
+
+from wtforms.widgets.core import Select
+
+
+class Field:
+    """
+    The parts of ``SelectField`` and ``SelectMultipleField`` that the
+    widget reads.
+    """
+
+    def __init__(self, choices, data=None, multiple=False, coerce=str):
+        self.id = self.name = "field"
+        self.choices = choices
+        self.data = data
+        self.multiple = multiple
+        self.coerce = coerce
+
+    def _selected(self, value):
+        if self.multiple:
+            return self.data is not None and self.coerce(value) in self.data
+        return self.coerce(value) == self.data
+
+    def has_groups(self):
+        return isinstance(self.choices, dict)
+
+    def iter_groups(self):
+        for group, choices in self.choices.items():
+            yield group, [
+                (value, label, self._selected(value))
+                for value, label in choices
+            ]
+
+    def iter_choices(self):
+        for value, label in self.choices:
+            yield value, label, self._selected(value)
+
+
+CHOICES = [("1", "One"), ("2", "Two & Three")]
+
+
+def test_select_renders_from_the_choice_cache():
+    widget = Select()
+
+    first = widget(Field(CHOICES, data="2"))
+    second = widget(Field(list(CHOICES), data="1"))
+
+    assert first == (
+        '<select id="field" name="field">'
+        '<option value="1">One</option>'
+        '<option selected value="2">Two &amp; Three</option>'
+        "</select>"
+    )
+    assert second == (
+        '<select id="field" name="field">'
+        '<option selected value="1">One</option>'
+        '<option value="2">Two &amp; Three</option>'
+        "</select>"
+    )
+    assert len(widget._choice_sets) == 1
+
+
+def test_multiple_select_with_no_data():
+    widget = Select(multiple=True)
+
+    html = widget(Field(CHOICES, data=None, multiple=True))
+
+    assert html == (
+        '<select id="field" multiple name="field">'
+        '<option value="1">One</option>'
+        '<option value="2">Two &amp; Three</option>'
+        "</select>"
+    )
+
+
+def test_multiple_select_marks_every_selected_value():
+    widget = Select(multiple=True)
+
+    html = widget(Field(CHOICES, data=["1", "2"], multiple=True))
+
+    assert html.count("<option selected") == 2
+
+
+def test_unhashable_choices_fall_back_to_render_option():
+    widget = Select()
+
+    html = widget(Field([(["x"], "List")], data=["x"], coerce=lambda v: v))
+
+    assert html == (
+        '<select id="field" name="field">'
+        '<option selected value="[&#39;x&#39;]">List</option>'
+        "</select>"
+    )
+    assert not hasattr(widget, "_choice_sets")
+    assert not widget._options
+
+
+def test_grouped_choices_use_the_option_cache():
+    widget = Select()
+
+    html = widget(Field({"Numbers": CHOICES}, data="1"))
+
+    assert html == (
+        '<select id="field" name="field">'
+        '<optgroup label="Numbers">'
+        '<option selected value="1">One</option>'
+        '<option value="2">Two &amp; Three</option>'
+        "</optgroup>"
+        "</select>"
+    )
+    assert len(widget._options) == 2
+
+
+def test_render_option_overrides_are_honored():
+    class CustomSelect(Select):
+        @classmethod
+        def render_option(cls, value, label, selected, **kwargs):
+            return Markup(
+                f'<option data-custom value="{value}">{label}</option>'
+            )
+
+    widget = CustomSelect()
+
+    html = widget(Field(CHOICES, data="1"))
+
+    assert html.count("<option data-custom") == 2
+    assert not hasattr(widget, "_choice_sets")
+    assert not hasattr(widget, "_options")
+
+
+def test_markup_and_str_labels_do_not_share_options():
+    widget = Select()
+    markup = Markup("<b>bold</b>")
+    plain = "<b>bold</b>"
+
+    trusted = widget(Field({"Group": [("1", markup)]}))
+    untrusted = widget(Field({"Group": [("1", plain)]}))
+    trusted_again = widget(Field({"Group": [("1", markup)]}))
+
+    assert "<b>bold</b>" in trusted
+    assert "&lt;b&gt;bold&lt;/b&gt;" in untrusted
+    assert trusted_again == trusted
+
+
+def test_markup_and_str_labels_do_not_share_choice_sets():
+    widget = Select()
+    markup = [("1", Markup("<b>bold</b>"))]
+    plain = [("1", "<b>bold</b>")]
+
+    trusted = widget(Field(markup))
+    untrusted = widget(Field(plain))
+    trusted_again = widget(Field(markup))
+
+    assert "<b>bold</b>" in trusted
+    assert "&lt;b&gt;bold&lt;/b&gt;" in untrusted
+    assert trusted_again == trusted
+    assert len(widget._choice_sets) == 2
@@ -0,0 +1,138 @@
+import gzip
+import json
+
+import pytest
+from sanic.response import text
+
+from sanic_ext.utils.spec import SpecCache
+
+
+@pytest.fixture
+def built_paths():
+    return []
+
+
+@pytest.fixture
+def spec(built_paths):
+    def build_path(uri, routes):
+        built_paths.append(uri)
+        return {
+            method.lower(): {"operationId": name}
+            for _, name, _, method_handlers in routes
+            for method, _ in method_handlers
+        }
+
+    return SpecCache(lambda: {"openapi": "3.0.3"}, build_path, "/docs")
+
+
+async def handler(request):
+    return text("")
+
+
+def _add_routes(app, *uris):
+    for uri in uris:
+        app.add_route(handler, uri, name=uri.strip("/"))
+
+
+def test_document(app, spec):
+    _add_routes(app, "/items")
+    app.router.finalize()
+
+    body, gzipped, etag = spec.get(app)
+
+    assert json.loads(body) == {
+        "openapi": "3.0.3",
+        "paths": {"/items": {"get": {"operationId": "items"}}},
+    }
+    assert gzip.decompress(gzipped) == body
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_empty_document_members(app):
+    spec = SpecCache(dict, lambda uri, routes: {}, "/docs")
+    _add_routes(app, "/items")
+    app.router.finalize()
+
+    body, _, _ = spec.get(app)
+
+    assert json.loads(body) == {"paths": {"/items": {}}}
+
+
+def test_response_variants(app, spec):
+    _add_routes(app, "/items")
+
+    @app.get("/docs/spec.json")
+    async def serve(request):
+        return spec.response(request)
+
+    _, plain = app.test_client.get(
+        "/docs/spec.json", headers={"accept-encoding": "identity"}
+    )
+    _, gzipped = app.test_client.get(
+        "/docs/spec.json", headers={"accept-encoding": "gzip"}
+    )
+
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.body == plain.body
+    assert plain.headers["vary"] == "accept-encoding"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert "/docs/spec.json" not in json.loads(plain.body)["paths"]
+
+
+@pytest.mark.parametrize("if_none_match", ("{etag}", "*", '"other", {etag}'))
+def test_not_modified(app, spec, if_none_match):
+    _add_routes(app, "/items")
+
+    @app.get("/docs/spec.json")
+    async def serve(request):
+        return spec.response(request)
+
+    _, first = app.test_client.get(
+        "/docs/spec.json", headers={"accept-encoding": "identity"}
+    )
+    etag = first.headers["etag"]
+    _, second = app.test_client.get(
+        "/docs/spec.json",
+        headers={
+            "accept-encoding": "identity",
+            "if-none-match": if_none_match.format(etag=etag),
+        },
+    )
+
+    assert second.status == 304
+    assert second.headers["etag"] == etag
+    assert not second.body
+
+
+def test_rebuilt_after_router_reset(app, spec, built_paths):
+    _add_routes(app, "/items", "/users")
+    app.router.finalize()
+    body, _, etag = spec.get(app)
+
+    assert spec.get(app)[0] is body
+    assert built_paths == ["/items", "/users"]
+
+    app.router.reset()
+    _add_routes(app, "/orders")
+    app.router.finalize()
+    new_body, _, new_etag = spec.get(app)
+
+    assert set(json.loads(new_body)["paths"]) == {
+        "/items",
+        "/users",
+        "/orders",
+    }
+    assert new_etag != etag
+    assert built_paths == ["/items", "/users", "/orders"]
+
+
+def test_invalidate_rebuilds_every_path(app, spec, built_paths):
+    _add_routes(app, "/items")
+    app.router.finalize()
+    spec.get(app)
+
+    spec.invalidate()
+    spec.get(app)
+
+    assert built_paths == ["/items", "/items"]
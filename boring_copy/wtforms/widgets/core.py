@@ -1,25 +1,45 @@
+import sys
+from collections import OrderedDict
+
 from markupsafe import escape, Markup
 
+ID_PLACEHOLDER = Markup("\x01")
+NAME_PLACEHOLDER = Markup("\x02")
+VALUE_PLACEHOLDER = Markup("\x00")
+
+_CLEAN_KEYS = {}
+_CLEAN_KEYS_SIZE = 1024
+
 
 def clean_key(key: str):
-    key = key.rstrip("_")
-    if key.startswith("data_") or key.startswith("aria_"):
-        key = key.replace("_", "_")
-    return key
+    try:
+        return _CLEAN_KEYS[key]
+    except KeyError:
+        pass
+    cleaned = key.rstrip("_")
+    if cleaned.startswith(("data_", "aria_")):
+        cleaned = cleaned.replace("_", "-")
+    cleaned = sys.intern(cleaned)
+    if len(_CLEAN_KEYS) < _CLEAN_KEYS_SIZE:
+        _CLEAN_KEYS[key] = cleaned
+    return cleaned
 
 
 def html_params(**kwargs):
-    params = []
+    """
+    Render keyword arguments as HTML attributes, sorted by name. ``True``
+    renders a bare attribute, ``False`` and ``None`` are left out.
+    """
+    parts = []
+    extend = parts.extend
     for k, v in sorted(kwargs.items()):
-        k = clean_key(k)
         if v is True:
-            params.append(k)
-        elif v is False:
-            pass
-        else:
-            params.append('{}="{}"'.format(str(k), escape(v)))
-
-    return " ".join(params)
+            extend((" ", _CLEAN_KEYS.get(k) or clean_key(k)))
+        elif v is not False and v is not None:
+            extend(
+                (" ", _CLEAN_KEYS.get(k) or clean_key(k), '="', escape(v), '"')
+            )
+    return "".join(parts)[1:]
 
 
 class ListWidget:
@@ -27,18 +47,33 @@ class ListWidget:
     def __init__(self, html_tag="ul", prefix_label=True):
         assert html_tag in ("ol", "ul")
         self.html_tag = html_tag
-        self.prefix_label = True
+        self.prefix_label = prefix_label
 
     def __call__(self, field, **kwargs):
+        html = []
+        self.render_into(field, html.append, **kwargs)
+        return Markup("".join(html))
+
+    def render_into(self, field, write, **kwargs):
+        """
+        Render the field and all of its subfields through ``write``, such as
+        ``list.append`` or ``io.StringIO.write``, without joining anything
+        per subfield.
+        """
         kwargs.setdefault("id", field.id)
-        html = ["<{} {]>".format(self.html_tag, html_params(**kwargs))]
+        write("<%s %s>" % (self.html_tag, html_params(**kwargs)))
         for subfield in field:
+            write("<li>")
             if self.prefix_label:
-                html.append(f"<li>{subfield.label} {subfield()}</li>")
+                write(subfield.label())
+                write(" ")
+                write(subfield())
             else:
-                html.append(f"<li>{subfield()} {subfield.label}</li>")
-        html.append("</%s>" % self.html_tag)
-        return Markup("".join(html))
+                write(subfield())
+                write(" ")
+                write(subfield.label())
+            write("</li>")
+        write("</%s>" % self.html_tag)
 
 
 class TableWidget:
@@ -48,56 +83,165 @@ class TableWidget:
 
     def __call__(self, field, **kwargs):
         html = []
+        self.render_into(field, html.append, **kwargs)
+        return Markup("".join(html))
+
+    def render_into(self, field, write, **kwargs):
+        """
+        Render the field and all of its subfields through ``write``, such as
+        ``list.append`` or ``io.StringIO.write``. Hidden fields are
+        collected in a list and written in front of the next visible one.
+        """
         if self.with_table_tag:
             kwargs.setdefault("id", field.id)
-            html.append("<table %s>" % html_params(**kwargs))
-        hidden = ""
+            write("<table %s>" % html_params(**kwargs))
+        hidden = []
         for subfield in field:
             if subfield.type in ("HiddenField", "CSRFTokenField"):
-                hidden += str(subfield)
-            else:
-                html.append(
-                    "<tr><th>%</th><td>%s%s</td></tr>"
-                    % (str(subfield.label), hidden, str(subfield))
-                )
-                hidden = ""
+                hidden.append(subfield())
+                continue
+            write("<tr><th>")
+            write(subfield.label())
+            write("</th><td>")
+            if hidden:
+                write("".join(hidden))
+                hidden = []
+            write(subfield())
+            write("</td></tr>")
         if self.with_table_tag:
-            html.append("</table>")
+            write("</table>")
         if hidden:
-            html.append(hidden)
-        return Markup("".join(html))
+            write("".join(hidden))
+
+
+class _LRUCache(OrderedDict):
+    """
+    A dict that evicts the least recently used entry past ``maxsize``.
+
+    Widgets are shared between threads, so another thread may evict a key
+    between two steps of ``get`` or ``__setitem__``. That only costs a cache
+    miss, never an error.
+    """
+
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+            self.move_to_end(key)
+        except KeyError:
+            return default
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            try:
+                self.popitem(last=False)
+            except KeyError:
+                pass
 
 
 class Input:
 
     html_params = staticmethod(html_params)
-    validation_attr = ["required"]
+    template_cache_size = 4096
+    validation_attrs = ["required"]
 
     def __init__(self, input_type=None):
         if input_type is not None:
             self.input_type = input_type
 
     def __call__(self, field, **kwargs):
-        kwargs.setdefault("id", field.id)
+        field_id = kwargs.pop("id") if "id" in kwargs else field.id
         kwargs.setdefault("type", self.input_type)
-        if "value" not in kwargs:
-            kwargs["value"] = field._value()
+        value = kwargs.pop("value") if "value" in kwargs else field._value()
         flags = getattr(field, "flags", {})
-        for k in dir(flags):
-            if k in self.validation_attr and k not in kwargs:
-                kwargs[k] = getattr(flags, k)
-        return Markup("<input %s>" % self.html_params(name=field.name, **kwargs))
+        for k in self.validation_attrs:
+            if k not in kwargs:
+                flag = getattr(flags, k, None)
+                if flag is not None:
+                    kwargs[k] = flag
+
+        template = None
+        if isinstance(field_id, str) and (
+            value is not True and value is not False and value is not None
+        ):
+            template = self.compile_template(kwargs)
+        if template is None:
+            return Markup(
+                "<input %s>"
+                % self.html_params(
+                    id=field_id, name=field.name, value=value, **kwargs
+                )
+            )
+        before_id, before_name, before_value, tail = template
+        return Markup(
+            "".join(
+                (
+                    before_id,
+                    escape(field_id),
+                    before_name,
+                    escape(field.name),
+                    before_value,
+                    escape(value),
+                    tail,
+                )
+            )
+        )
+
+    def compile_template(self, kwargs):
+        """
+        The markup of an input with the attributes ``kwargs``, split around
+        its ``id``, ``name`` and ``value``, or ``None`` if it cannot be
+        split. Templates are cached per widget and shared by every field
+        with the same attributes, keyed by all of them including the
+        validation flags, so a field whose flags change gets a new template.
+        Values are keyed with their type, since equal values such as ``0``
+        and ``False`` or ``Markup`` and ``str`` render differently.
+        """
+        try:
+            key = tuple(sorted((k, type(v), v) for k, v in kwargs.items()))
+            hash(key)
+        except TypeError:
+            key = None
+
+        templates = self.__dict__.get("_templates")
+        if templates is None:
+            templates = self._templates = _LRUCache(self.template_cache_size)
+        elif key is not None:
+            template = templates.get(key)
+            if template is not None:
+                return template
+
+        html = "<input %s>" % self.html_params(
+            id=ID_PLACEHOLDER,
+            name=NAME_PLACEHOLDER,
+            value=VALUE_PLACEHOLDER,
+            **kwargs
+        )
+        before_id, _, rest = html.partition(ID_PLACEHOLDER)
+        before_name, _, rest = rest.partition(NAME_PLACEHOLDER)
+        before_value, _, tail = rest.partition(VALUE_PLACEHOLDER)
+        template = (before_id, before_name, before_value, tail)
+        if sum(map(len, template)) != len(html) - 3:
+            return None
+        if key is not None:
+            templates[key] = template
+        return template
 
 
 class TextInput(Input):
     input_type = "text"
-    validation_attr = ["required", "maxlength", "minlength", "pattern"]
+    validation_attrs = ["required", "maxlength", "minlength", "pattern"]
 
 
 class PasswordInput(Input):
 
     input_type = "password"
-    validation_attr = ["required", "maxlength", "minlength", "pattern"]
+    validation_attrs = ["required", "maxlength", "minlength", "pattern"]
 
     def __init__(self, hide_value=True):
         self.hide_value = hide_value
@@ -136,7 +280,7 @@ class RadioInput(Input):
 
 class FileInput(Input):
     input_type = "file"
-    validation_attr = ["required", "accept"]
+    validation_attrs = ["required", "accept"]
 
     def __init__(self, multiple):
         super().__init__()
@@ -177,33 +321,166 @@ class TextArea:
 
 
 class Select:
+    choice_cache_size = 64
+    option_cache_size = 65536
+    stream_chunk_size = 512
     validation_attrs = ["required"]
 
     def __init__(self, multiple=False):
         self.multiple = multiple
 
     def __call__(self, field, **kwargs):
+        return Markup("".join(self.iter_render(field, **kwargs)))
+
+    def iter_render(self, field, **kwargs):
+        """
+        Yield the markup of the select in chunks of up to
+        ``stream_chunk_size`` options, so huge choice lists can be written
+        to a streamed response without building the whole string.
+        """
         kwargs.setdefault("id", field.id)
         if self.multiple:
             kwargs["multiple"] = True
         flags = getattr(field, "flags", {})
-
-        for k in dir(flags):
-            if k in self.validation_attrs and k not in kwargs:
-                kwargs[k] = getattr(flags, k)
-        html = ["<select %s>" % html_params(name=filed.name, **kwargs)]
-
-        if field.has_groups():
-            for group, choices in field.iter_groups:
-                html.append("<optgroup %s>" % html_params(label=group))
-                for val, label, selected in choices:
-                    html.append(self.render_option(val, label, selected))
-                html.append("</optgroup>")
+        for k in self.validation_attrs:
+            if k not in kwargs:
+                flag = getattr(flags, k, None)
+                if flag is not None:
+                    kwargs[k] = flag
+        yield "<select %s>" % html_params(name=field.name, **kwargs)
+
+        # The caches hold the markup of Select.render_option, not overrides
+        render_option = getattr(type(self).render_option, "__func__", None)
+        cached = render_option is Select.render_option.__func__
+        render = self._render_option if cached else self.render_option
+        choice_set = self._get_choice_set(field) if cached else None
+        positions = None
+        if choice_set is not None:
+            positions = self._selected_positions(field, choice_set[3])
+        if positions is not None:
+            yield from self._iter_choice_set(choice_set, positions)
+        elif field.has_groups():
+            for group, choices in field.iter_groups():
+                yield "<optgroup %s>" % html_params(label=group)
+                yield from self._iter_options(choices, render)
+                yield "</optgroup>"
         else:
-            for val, label, selected in field.iter_choices():
-                html.append(self.render_option(val, label, selected))
-        html.append("</select>")
-        return Markup("".join(html))
+            yield from self._iter_options(field.iter_choices(), render)
+        yield "</select>"
+
+    def _iter_options(self, choices, render):
+        chunk = []
+        for value, label, selected in choices:
+            chunk.append(render(value, label, selected))
+            if len(chunk) >= self.stream_chunk_size:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    def _get_choice_set(self, field):
+        """
+        The options of ``field.choices`` rendered once and cached by the
+        hash of the choices, as ``(choices, body, offsets, index)``: the
+        choices with the types of their items, the unselected options
+        joined in ``body``, where each option starts in ``body`` and the
+        positions of each coerced value. Fields copy their choices per
+        form, so equal choice lists share one entry. Grouped and unhashable
+        choices are not cached.
+        """
+        choices = getattr(field, "choices", None)
+        coerce = getattr(field, "coerce", None)
+        if not isinstance(choices, (list, tuple)) or coerce is None:
+            return None
+
+        choices = tuple(choices)
+        # Markup and str labels compare equal but are escaped differently
+        kinds = tuple(
+            tuple(map(type, choice))
+            if isinstance(choice, (list, tuple))
+            else type(choice)
+            for choice in choices
+        )
+        try:
+            key = (hash(choices), hash(kinds), coerce)
+        except TypeError:
+            return None
+        try:
+            choice_set = self._choice_sets.get(key)
+        except AttributeError:
+            self._choice_sets = _LRUCache(self.choice_cache_size)
+            choice_set = None
+        if choice_set is not None and choice_set[0] == (choices, kinds):
+            return choice_set
+
+        if choices and not isinstance(choices[0], (list, tuple)):
+            pairs = zip(choices, choices)
+        else:
+            pairs = choices
+        fragments = []
+        offsets = []
+        index = {}
+        offset = 0
+        try:
+            for position, (value, label) in enumerate(pairs):
+                fragment = self._render_option(value, label, False)
+                fragments.append(fragment)
+                offsets.append(offset)
+                offset += len(fragment)
+                index.setdefault(coerce(value), []).append(position)
+        except (TypeError, ValueError):
+            return None
+
+        choice_set = ((choices, kinds), "".join(fragments), offsets, index)
+        self._choice_sets[key] = choice_set
+        return choice_set
+
+    def _selected_positions(self, field, index):
+        data = field.data
+        if not self.multiple:
+            data = (data,)
+        elif data is None:
+            return []
+        positions = set()
+        try:
+            for value in data:
+                positions.update(index.get(value, ()))
+        except TypeError:
+            return None
+        return sorted(positions)
+
+    def _iter_choice_set(self, choice_set, positions):
+        _, body, offsets, _ = choice_set
+        chunk_size = self.stream_chunk_size * 64
+        start = 0
+        for position in [*positions, None]:
+            end = len(body) if position is None else offsets[position]
+            for chunk_start in range(start, end, chunk_size):
+                yield body[chunk_start:min(end, chunk_start + chunk_size)]
+            if position is not None:
+                yield "<option selected"
+                start = end + len("<option")
+
+    def _render_option(self, value, label, selected):
+        try:
+            cache = self._options
+        except AttributeError:
+            cache = self._options = _LRUCache(self.option_cache_size)
+        # Markup and str labels compare equal but are escaped differently
+        key = (type(value), value, type(label), label)
+        try:
+            options = cache.get(key)
+        except TypeError:
+            return self.render_option(value, label, selected)
+
+        if options is None:
+            params = html_params(value=str(value) if value is True else value)
+            rest = "".join(
+                (" " if params else "", params, ">", escape(label), "</option>")
+            )
+            options = ("<option" + rest, "<option selected" + rest)
+            cache[key] = options
+        return options[1] if selected else options[0]
 
     @classmethod
     def render_option(cls, value, label, selected, **kwargs):
@@ -226,7 +503,7 @@ class Option:
 
 class SearchInput(Input):
     input_type = "search"
-    validation_attr = ["required", "maxlength", "minlength", "pattern"]
+    validation_attrs = ["required", "maxlength", "minlength", "pattern"]
 
 
 class TelInput(Input):
@@ -280,7 +557,7 @@ class ColorInput(Input):
 
 class NumberInput(Input):
     input_type = "number"
-    validation_attr = ["required", "max", "min", "step"]
+    validation_attrs = ["required", "max", "min", "step"]
 
     def __init__(self, step=None, min=None, max=None):
         self.step = step
@@ -300,7 +577,7 @@ class NumberInput(Input):
 
 class RangeInput(Input):
     input_type = "range"
-    validation_attr = ["required", "max", "min", "step"]
+    validation_attrs = ["required", "max", "min", "step"]
 
     def __init__(self, step=None):
         self.step = step